@@ -1,31 +1,195 @@
 import numpy as np
 import heapq
+import math
+import os
+import tempfile
+import time
+from array import array
+from bisect import bisect_left
 from collections import deque
+from distance_table import DistanceTable
+from external_bfs import ExternalBFS
+from grid import MOVES, UnsupportedBoard, adjacent_cells
+from parallel_astar import hda_star, EXPANDED, GENERATED, DUPLICATES, PEAK_OPEN, PEAK_CLOSED
+from pattern_db import AdditivePatternDatabase
+from state_set import StateSet, BloomFilter
 
-class Node:
-    def __init__(self, board, parent=None, move=None, g=0, h=0):
-        self.board = board
-        self.parent = parent
-        self.move = move
-        self.g = g  # Cost from start to current node
-        self.h = h  # Heuristic cost to goal
-        self.f = g + h  # Total cost
+_walking_distance_tables = {}  # Shared by every Puzzle with the same size and blank goal line
 
-    def __eq__(self, other):
-        return np.array_equal(self.board, other.board)
+# Per-tile distance of a tile dr rows and dc columns from its goal cell, for scalars and NumPy arrays alike
+TILE_DISTANCES = {
+    "manhattan": lambda dr, dc: dr + dc,
+    "euclidean": lambda dr, dc: (dr * dr + dc * dc) ** 0.5,
+    "misplaced": lambda dr, dc: (dr + dc > 0) * 1,
+}
+MAX_TABLE_CELLS = 1024  # Larger boards (above 32x32) compute tile distances from goal_positions instead
 
-    def __lt__(self, other):
-        return self.f < other.f
 
-    def __hash__(self):
-        return hash(self.board.tostring())
+def longest_increasing_subsequence(values):
+    tails = []
+    for value in values:
+        position = bisect_left(tails, value)
+        if position == len(tails):
+            tails.append(value)
+        else:
+            tails[position] = value
+    return len(tails)
+
+
+def count_inversions(tiles):
+    # Fenwick tree over tile values, scanning right to left and counting smaller tiles already seen
+    tree = [0] * (len(tiles) + 1)
+    inversions = 0
+    for tile in reversed(tiles):
+        if tile == 0:  # The blank is not part of the permutation
+            continue
+        index = tile - 1
+        while index > 0:
+            inversions += tree[index]
+            index -= index & -index
+        index = tile
+        while index < len(tree):
+            tree[index] += 1
+            index += index & -index
+    return inversions
+
+
+def board_parity(tiles, size):
+    # Invariant under every move: two boards are mutually reachable iff their parities match
+    inversions = count_inversions(tiles)
+    if size % 2 == 0:
+        inversions += tiles.index(0) // size  # Vertical moves flip the inversion parity
+    return inversions % 2
+
+
+def walking_distance_table(size, blank_line):
+    # BFS over per-line counts: counts[line * size + group] tiles in line belong to goal line group
+    key = (size, blank_line)
+    if key in _walking_distance_tables:
+        return _walking_distance_tables[key]
+    if size > 4:
+        raise UnsupportedBoard("Walking distance tables are only built for boards up to 4x4")
+
+    goal_counts = [0] * (size * size)
+    for line in range(size):
+        goal_counts[line * size + line] = size - 1 if line == blank_line else size
+    start = (tuple(goal_counts), blank_line)
+    table = {start: 0}
+    frontier = deque([start])
+
+    while frontier:
+        counts, blank = frontier.popleft()
+        for new_blank in (blank - 1, blank + 1):
+            if not 0 <= new_blank < size:
+                continue
+            for group in range(size):
+                if counts[new_blank * size + group] == 0:
+                    continue
+                # A tile of this group slides from the blank's new line into its old one
+                new_counts = list(counts)
+                new_counts[new_blank * size + group] -= 1
+                new_counts[blank * size + group] += 1
+                new_key = (tuple(new_counts), new_blank)
+                if new_key not in table:
+                    table[new_key] = table[(counts, blank)] + 1
+                    frontier.append(new_key)
+
+    _walking_distance_tables[key] = table
+    return table
+
+class SearchLimitExceeded(Exception):
+    pass
+
+class SearchStats:
+    def __init__(self):
+        self.expanded = 0
+        self.generated = 0
+        self.duplicates = 0  # Children dropped because the state was already reached as cheaply
+        self.peak_open = 0
+        self.peak_closed = 0
+        self.heuristic_time = 0.0  # Full and batched evaluations, incremental table updates are not timed
+        self.suboptimality = None  # Proven cost ratio to the optimum, set by anytime searches
+        self.start_time = time.perf_counter()
+        self.end_time = None
+
+    @property
+    def elapsed(self):
+        end_time = self.end_time if self.end_time is not None else time.perf_counter()
+        return end_time - self.start_time
+
+    @property
+    def nodes_per_second(self):
+        return self.expanded / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def heuristic_share(self):
+        return self.heuristic_time / self.elapsed if self.elapsed > 0 else 0.0
+
+    def as_dict(self):
+        return {
+            "expanded": self.expanded,
+            "generated": self.generated,
+            "duplicates": self.duplicates,
+            "peak_open": self.peak_open,
+            "peak_closed": self.peak_closed,
+            "elapsed": self.elapsed,
+            "nodes_per_second": self.nodes_per_second,
+            "heuristic_share": self.heuristic_share,
+            "suboptimality": self.suboptimality,
+        }
+
+    def __repr__(self):
+        return (f"SearchStats(expanded={self.expanded}, generated={self.generated}, duplicates={self.duplicates}, "
+                f"peak_open={self.peak_open}, peak_closed={self.peak_closed}, elapsed={self.elapsed:.4f}s, "
+                f"nodes_per_second={self.nodes_per_second:.0f}, heuristic_share={self.heuristic_share:.1%})")
+
+class NodeArena:
+    # Search nodes as parallel typed arrays: 8 + 4 + 2 + 1 = 15 bytes per node on boards up to 4x4.
+    # The move that led to a node is not stored, it is the step from the parent's blank to the node's
+    def __init__(self, packed):
+        self.states = array('Q') if packed else []  # Wider boards keep Python ints
+        self.parents = array('i')  # -1 marks the root
+        self.g = array('H')  # Widened to 32 bits if a path ever gets that long
+        self.blanks = array('B') if packed else array('H')  # Blank cell of each state, never searched for again
+
+    def __len__(self):
+        return len(self.parents)
+
+    def add(self, state, parent=-1, g=0, blank=0):
+        self.states.append(state)
+        self.parents.append(parent)
+        self.blanks.append(blank)
+        try:
+            self.g.append(g)
+        except OverflowError:
+            self.g = array('I', self.g)
+            self.g.append(g)
+        return len(self.parents) - 1
 
 class Puzzle:
     def __init__(self, initial_state, goal_state):
         self.initial_state = np.array(initial_state)
         self.goal_state = np.array(goal_state)
         self.size = self.initial_state.shape[0]
+        self.cells = self.size * self.size
+        # 4 bits per cell packs boards up to 4x4 into a 64-bit integer, larger boards get wider cells
+        self.bits = max(4, (self.cells - 1).bit_length())
+        self.mask = (1 << self.bits) - 1
+        self.goal = self.encode(self.goal_state)
         self.goal_positions = self.calculate_goal_positions()
+        self.adjacent = adjacent_cells(self.size).tolist()
+        self.move_table = [self.legal_moves(blank) for blank in range(self.cells)]
+        self.goal_rows = np.array([self.goal_positions[tile][0] for tile in range(self.cells)])
+        self.goal_columns = np.array([self.goal_positions[tile][1] for tile in range(self.cells)])
+        self.tile_tables = {}  # Built on first use per heuristic, a cells x cells table is too big for every board
+        # Heuristics without a per-tile table, evaluated from scratch on every state
+        self.heuristics = {
+            "linear_conflict": self.heuristic_linear_conflict,
+            "walking_distance": self.heuristic_walking_distance,
+            "pdb": self.heuristic_pdb,
+        }
+        self.pattern_databases = None
+        self.distance_table = None
 
     def calculate_goal_positions(self):
         positions = {}
@@ -34,179 +198,872 @@ class Puzzle:
                 positions[self.goal_state[r, c]] = (r, c)
         return positions
 
-    def get_neighbors(self, node):
-        neighbors = []
-        zero_pos = np.argwhere(node.board == 0)[0]
-        possible_moves = [(-1, 0), (1, 0), (0, -1), (0, 1)]  # Up, down, left, right
+    def tile_table(self, name):
+        # table[tile][index] is the distance of tile from its goal when it sits at cell index, None for
+        # heuristics without a per-tile distance and for boards too large to tabulate. Nested lists because
+        # their scalar lookups are several times faster than NumPy's
+        if name not in self.tile_tables:
+            if name not in TILE_DISTANCES or self.cells > MAX_TABLE_CELLS:
+                self.tile_tables[name] = None
+            else:
+                r, c = np.divmod(np.arange(self.cells), self.size)
+                distances = TILE_DISTANCES[name](np.abs(r - self.goal_rows[:, None]),
+                                                 np.abs(c - self.goal_columns[:, None]))
+                distances[0] = 0  # The blank never contributes
+                self.tile_tables[name] = distances.tolist()
+        return self.tile_tables[name]
+
+    def encode(self, board):
+        state = 0
+        for index, tile in enumerate(np.asarray(board).flatten()):
+            state |= int(tile) << (index * self.bits)
+        return state
+
+    def decode(self, state):
+        board = np.empty(self.cells, dtype=int)
+        for index in range(self.cells):
+            board[index] = (state >> (index * self.bits)) & self.mask
+        return board.reshape(self.size, self.size)
 
-        for move in possible_moves:
-            new_pos = zero_pos + move
-            if 0 <= new_pos[0] < self.size and 0 <= new_pos[1] < self.size:
-                new_board = node.board.copy()
-                new_board[zero_pos[0], zero_pos[1]], new_board[new_pos[0], new_pos[1]] = new_board[new_pos[0], new_pos[1]], new_board[zero_pos[0], zero_pos[1]]
-                neighbors.append(Node(new_board, node, move))
+    def decode_many(self, states):
+        # One row of tiles per state, unpacked with vectorized shifts while the states fit in 64 bits
+        if self.cells * self.bits <= 64:
+            packed = np.array(states, dtype=np.uint64).reshape(-1, 1)
+            shifts = np.arange(self.cells, dtype=np.uint64) * np.uint64(self.bits)
+            return ((packed >> shifts) & np.uint64(self.mask)).astype(np.intp)
+        # Wider states go through their little-endian bytes, unpacked to bits and regrouped per cell
+        width = (self.cells * self.bits + 7) // 8
+        raw = np.frombuffer(b"".join(int(state).to_bytes(width, "little") for state in states), dtype=np.uint8)
+        bits = np.unpackbits(raw.reshape(-1, width), axis=1, bitorder="little")[:, :self.cells * self.bits]
+        return bits.reshape(-1, self.cells, self.bits).astype(np.intp) @ (1 << np.arange(self.bits, dtype=np.intp))
 
-        return neighbors
+    def find_blank(self, state):
+        for index in range(self.cells):
+            if (state >> (index * self.bits)) & self.mask == 0:
+                return index
+        raise ValueError("Board has no blank tile")
 
-    def heuristic(self, board):
+    def legal_moves(self, blank):
+        # (new blank cell, move code, shift of the new blank cell, shift of the blank cell) per legal move
+        return tuple((new_blank, move, new_blank * self.bits, blank * self.bits)
+                     for move, new_blank in enumerate(self.adjacent[blank]) if new_blank >= 0)
+
+    def neighbor_states(self, state):
+        states = []
+        for _, _, new_shift, blank_shift in self.move_table[self.find_blank(state)]:
+            tile = (state >> new_shift) & self.mask
+            states.append(state - (tile << new_shift) + (tile << blank_shift))
+        return states
+
+    def successors(self, state, table=None, blank=None, skip_blank=-1):
+        # (child state, move code, heuristic change, child blank) for every legal move but the one that puts
+        # the blank on skip_blank, which is the parent's blank when undoing the last move
+        if blank is None:
+            blank = self.find_blank(state)
+        children = []
+        for new_blank, move, new_shift, blank_shift in self.move_table[blank]:
+            if new_blank == skip_blank:
+                continue
+            # Sliding the tile into the blank only touches two cells of the packed state
+            tile = (state >> new_shift) & self.mask
+            new_state = state - (tile << new_shift) + (tile << blank_shift)
+            # Only the moved tile changes its distance, so the parent's value can be updated
+            delta = table[tile][blank] - table[tile][new_blank] if table is not None else 0
+            children.append((new_state, move, delta, new_blank))
+        return children
+
+    def table_heuristic(self, state, table):
         total_distance = 0
-        for r in range(board.shape[0]):
-            for c in range(board.shape[1]):
-                if board[r, c] != 0:  # Assuming 0 is the blank tile
-                    goal_r, goal_c = self.goal_positions[board[r, c]]
-                    total_distance += abs(r - goal_r) + abs(c - goal_c)
+        for index in range(self.cells):
+            total_distance += table[(state >> (index * self.bits)) & self.mask][index]
         return total_distance
 
-    def heuristic_2(self, board):
-        total_distance = 0
-        for r in range(board.shape[0]):
-            for c in range(board.shape[1]):
-                if board[r, c] != 0:  # Assuming 0 is the blank tile
-                    goal_r, goal_c = self.goal_positions[board[r, c]]
-                    total_distance += np.sqrt((r - goal_r) ** 2 + (c - goal_c) ** 2)
+    def batch_heuristic(self, states, name):
+        if name not in TILE_DISTANCES:
+            raise ValueError(f"Heuristic {name} has no per-tile distance to vectorize")
+        boards = self.decode_many(states)
+        # Every tile's offset from its goal cell at once, computed from the goal positions without a table
+        r, c = np.divmod(np.arange(self.cells), self.size)
+        distances = TILE_DISTANCES[name](np.abs(r - self.goal_rows[boards]), np.abs(c - self.goal_columns[boards]))
+        return (distances * (boards != 0)).sum(axis=1)
+
+    def heuristic_function(self, name):
+        if name in TILE_DISTANCES:
+            table = self.tile_table(name)
+            if table is None:
+                return lambda state: self.batch_heuristic([state], name)[0].item()
+            return lambda state: self.table_heuristic(state, table)
+        if name in self.heuristics:
+            if name == "pdb" and self.pattern_databases is None:
+                self.load_pattern_databases()  # Before the search starts, raises if the tables were never built
+            return self.heuristics[name]
+        raise ValueError(f"Unknown heuristic: {name}")
+
+    def tile_cells(self, state):
+        cells = [0] * self.cells
+        for index in range(self.cells):
+            cells[(state >> (index * self.bits)) & self.mask] = index
+        return cells
+
+    def heuristic_linear_conflict(self, state):
+        tiles = [(state >> (index * self.bits)) & self.mask for index in range(self.cells)]
+        total_distance = self.heuristic_function("manhattan")(state)
+
+        for line in range(self.size):
+            row_goals = []
+            column_goals = []
+            for offset in range(self.size):
+                tile = tiles[line * self.size + offset]
+                if tile != 0 and self.goal_positions[tile][0] == line:
+                    row_goals.append(self.goal_positions[tile][1])
+                tile = tiles[offset * self.size + line]
+                if tile != 0 and self.goal_positions[tile][1] == line:
+                    column_goals.append(self.goal_positions[tile][0])
+            # Every tile outside the longest in-order run must leave the line and come back
+            total_distance += 2 * (len(row_goals) - longest_increasing_subsequence(row_goals))
+            total_distance += 2 * (len(column_goals) - longest_increasing_subsequence(column_goals))
         return total_distance
 
-    def is_solved(self, board):
-        return np.array_equal(board, self.goal_state)
+    def heuristic_walking_distance(self, state):
+        blank_r, blank_c = self.goal_positions[0]
+        row_table = walking_distance_table(self.size, blank_r)
+        column_table = walking_distance_table(self.size, blank_c)
+        row_counts = [0] * self.cells
+        column_counts = [0] * self.cells
+        for index in range(self.cells):
+            tile = (state >> (index * self.bits)) & self.mask
+            r, c = divmod(index, self.size)
+            if tile == 0:
+                row_blank, column_blank = r, c
+            else:
+                goal_r, goal_c = self.goal_positions[tile]
+                row_counts[r * self.size + goal_r] += 1
+                column_counts[c * self.size + goal_c] += 1
+        # Vertical moves only change the row counts and horizontal moves only the column counts
+        return row_table[(tuple(row_counts), row_blank)] + column_table[(tuple(column_counts), column_blank)]
+
+    def load_pattern_databases(self, partition=None, **kwargs):
+        # Memory-maps the tables, missing ones are only built with build=True (or python pattern_db.py)
+        self.pattern_databases = AdditivePatternDatabase(self.goal_state, partition, **kwargs)
+
+    def load_distance_table(self, **kwargs):
+        if self.size != 3:
+            raise UnsupportedBoard(f"A full distance table is only practical for 3x3 boards, "
+                                   f"not {self.size}x{self.size}")
+        self.distance_table = DistanceTable(self.goal_state, **kwargs)
+
+    def heuristic_pdb(self, state):
+        if self.pattern_databases is None:
+            raise RuntimeError("Pattern databases are not loaded, call load_pattern_databases first")
+        return self.pattern_databases.value(self.tile_cells(state))
+
+    def is_solved(self, state):
+        return state == self.goal
+
+    def parity(self, state):
+        tiles = [(state >> (index * self.bits)) & self.mask for index in range(self.cells)]
+        return board_parity(tiles, self.size)
 
     def is_solvable(self):
-        print("checking")
-        flat_board = self.initial_state.flatten()
-        inversions = 0
-        for i in range(len(flat_board)):
-            for j in range(i + 1, len(flat_board)):
-                if flat_board[i] > flat_board[j] != 0:
-                    inversions += 1
-        if self.size % 2 != 0:
-            return inversions % 2 == 0
-        else:
-            blank_row = np.argwhere(self.initial_state == 0)[0][0]
-            if (self.size - blank_row) % 2 == 0:
-                return inversions % 2 != 0
-            else:
-                return inversions % 2 == 0
+        return board_parity(self.initial_state.flatten().tolist(), self.size) == \
+            board_parity(self.goal_state.flatten().tolist(), self.size)
 
 class Solver:
-    def __init__(self, puzzle):
+    ALGORITHMS = {
+        "bfs": "solve_bfs",
+        "external_bfs": "solve_external_bfs",
+        "dfs": "solve_dfs",
+        "dls": "solve_dls",
+        "iddfs": "solve_iddfs",
+        "bidirectional": "solve_bidirectional",
+        "astar": "solve_astar",
+        "astar_euclidean": "solve_astar_eucleadian",
+        "epeastar": "solve_epeastar",
+        "idastar": "solve_idastar",
+        "hdastar": "solve_hdastar",
+        "arastar": "solve_arastar",
+        "beam": "solve_beam",
+        "table": "solve_table",
+    }
+
+    # Largest optimal solution length (God's number) of each board size, the default depth limit for DLS
+    DEFAULT_DEPTH_LIMITS = {2: 6, 3: 31, 4: 80}
+
+    def __init__(self, puzzle, heuristic="manhattan", node_limit=None, time_limit=None, vectorized=False,
+                 progress_callback=None, progress_interval=10000):
         self.puzzle = puzzle
+        self.heuristic = heuristic
+        self.vectorized = vectorized  # Score all children of an expansion with one batch_heuristic call
+        self.node_limit = node_limit  # Maximum expansions per solve, None for unbounded
+        self.time_limit = time_limit  # Seconds per solve, None for unbounded
+        self.progress_callback = progress_callback  # Called with the live SearchStats every progress_interval expansions
+        self.progress_interval = progress_interval
+        self.stats = SearchStats()
+        self.deadline = None
+
+    def solve(self, algorithm):
+        if algorithm not in self.ALGORITHMS:
+            raise ValueError(f"Unknown algorithm: {algorithm}")
+        return getattr(self, self.ALGORITHMS[algorithm])()
+
+    def start_search(self):
+        self.stats = SearchStats()
+        self.deadline = time.perf_counter() + self.time_limit if self.time_limit is not None else None
+
+    def finish_search(self, path):
+        self.stats.end_time = time.perf_counter()
+        return path,self.stats
+
+    def count_expansion(self, open_size, closed_size=0):
+        stats = self.stats
+        stats.expanded += 1
+        if open_size > stats.peak_open:
+            stats.peak_open = open_size
+        if closed_size > stats.peak_closed:
+            stats.peak_closed = closed_size
+        if self.node_limit is not None and stats.expanded > self.node_limit:
+            stats.end_time = time.perf_counter()
+            raise SearchLimitExceeded(f"Node limit of {self.node_limit} expansions reached")
+        if self.progress_callback is not None and stats.expanded % self.progress_interval == 0:
+            self.progress_callback(stats)
+        # Reading the clock on every expansion would cost more than the expansion itself
+        if self.deadline is not None and stats.expanded % 1024 == 0 and time.perf_counter() > self.deadline:
+            stats.end_time = time.perf_counter()
+            raise SearchLimitExceeded(f"Time limit reached after {stats.expanded} expansions")
+
+    def count_expansions(self, count, open_size, closed_size=0):
+        # Block form of count_expansion for searches that expand a whole chunk of states at once
+        stats = self.stats
+        previous = stats.expanded
+        stats.expanded += count
+        stats.peak_open = max(stats.peak_open, open_size)
+        stats.peak_closed = max(stats.peak_closed, closed_size)
+        if self.node_limit is not None and stats.expanded > self.node_limit:
+            stats.end_time = time.perf_counter()
+            raise SearchLimitExceeded(f"Node limit of {self.node_limit} expansions reached")
+        if self.progress_callback is not None and \
+                stats.expanded // self.progress_interval > previous // self.progress_interval:
+            self.progress_callback(stats)
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            stats.end_time = time.perf_counter()
+            raise SearchLimitExceeded(f"Time limit reached after {stats.expanded} expansions")
+
+    def timed(self, function, *args):
+        start_time = time.perf_counter()
+        result = function(*args)
+        self.stats.heuristic_time += time.perf_counter() - start_time
+        return result
 
-    def solve_bfs(self):
-        initial_node = Node(self.puzzle.initial_state)
-        if self.puzzle.is_solved(initial_node.board):
-            return self.reconstruct_path(initial_node),0
+    def new_arena(self):
+        return NodeArena(self.puzzle.cells * self.puzzle.bits <= 64)
 
-        frontier = deque([initial_node])
-        explored = set()
-        explored.add(initial_node)
+    def new_explored_set(self, kind):
+        # "set" is exact and fastest per lookup, "compact" is exact at 16-32 bytes per state instead of ~80,
+        # "bloom" takes under 2 bytes per state but may report unseen states as explored
+        if kind == "set":
+            return set()
+        if self.puzzle.cells * self.puzzle.bits > 64:
+            raise UnsupportedBoard("Compact explored sets need states that pack into 64 bits (boards up to 4x4)")
+        if kind == "compact":
+            return StateSet()
+        if kind == "bloom":
+            return BloomFilter(min(math.factorial(self.puzzle.cells) // 2, 10 ** 7))
+        raise ValueError(f"Unknown explored set: {kind}")
+
+    def first_visit(self, explored):
+        # Adds a state and tells whether it was new. The compact sets already answer that from one probe,
+        # and for the Bloom filter a separate membership test would hash and probe every bit twice
+        if not isinstance(explored, set):
+            return explored.add
+
+        def visit(state):
+            if state in explored:
+                return False
+            explored.add(state)
+            return True
+        return visit
+
+    def add_root(self, arena, state):
+        # The only blank search of a solve, every later node gets its blank from the move table
+        return arena.add(state, blank=self.puzzle.find_blank(state))
+
+    def parent_blank(self, arena, index):
+        parent = arena.parents[index]
+        return arena.blanks[parent] if parent != -1 else -1
+
+    def expand(self, arena, index, table=None):
+        # Children of a node without the move that leads straight back to its parent
+        return self.puzzle.successors(arena.states[index], table, arena.blanks[index], self.parent_blank(arena, index))
+
+    def solve_bfs(self, explored_set="set"):
+        self.start_search()
+        arena = self.new_arena()
+        initial_state = self.puzzle.encode(self.puzzle.initial_state)
+        root = self.add_root(arena, initial_state)
+        if self.puzzle.is_solved(initial_state):
+            return self.finish_search(self.reconstruct_path(arena, root))
+
+        frontier = deque([root])
+        explored = self.new_explored_set(explored_set)
+        first_visit = self.first_visit(explored)
+        first_visit(initial_state)
 
         while frontier:
-            current_node = frontier.popleft()
-            if self.puzzle.is_solved(current_node.board):
-                return self.reconstruct_path(current_node),len(explored)
+            current = frontier.popleft()
+            if self.puzzle.is_solved(arena.states[current]):
+                return self.finish_search(self.reconstruct_path(arena, current))
+            self.count_expansion(len(frontier), len(explored))
 
-            for neighbor in self.puzzle.get_neighbors(current_node):
-                if neighbor not in explored:
-                    frontier.append(neighbor)
-                    explored.add(neighbor)
+            for new_state, _, _, new_blank in self.expand(arena, current):
+                if not first_visit(new_state):
+                    self.stats.duplicates += 1
+                    continue
+                frontier.append(arena.add(new_state, current, arena.g[current] + 1, new_blank))
+                self.stats.generated += 1
 
-        return None,0  # No solution found
+        return self.finish_search(None)  # No solution found
 
-    def solve_dfs(self):
-        initial_node = Node(self.puzzle.initial_state)
-        if self.puzzle.is_solved(initial_node.board):
-            return self.reconstruct_path(initial_node),0
+    def solve_external_bfs(self, directory=None, buffer_size=1000000):
+        # Layered BFS with the layers on disk, for spaces whose explored set does not fit in memory
+        self.start_search()
+        if self.puzzle.cells * self.puzzle.bits > 64:
+            raise UnsupportedBoard("External BFS needs states that pack into 64 bits (boards up to 4x4)")
+        if not self.puzzle.is_solvable():
+            return self.finish_search(None)  # The goal is in the other half of the space
 
-        frontier = [initial_node]
-        explored = set()
-        explored.add(initial_node)
+        with tempfile.TemporaryDirectory(dir=directory, prefix="external_bfs_") as work_directory:
+            search = ExternalBFS(self.puzzle, work_directory, buffer_size)
+            initial_state = self.puzzle.encode(self.puzzle.initial_state)
+
+            def on_chunk(expanded, generated, layer_size):
+                self.stats.generated += generated
+                self.count_expansions(expanded, layer_size)
+
+            depth = search.run(initial_state, self.puzzle.goal, on_chunk=on_chunk)
+            self.stats.duplicates = search.duplicates
+            self.stats.generated -= search.duplicates  # Only count children that were new, as solve_bfs does
+            if depth is None:
+                return self.finish_search(None)
+            return self.finish_search([self.puzzle.decode(state) for state in search.path_to(self.puzzle.goal, depth)])
+
+    def solve_dfs(self, explored_set="set"):
+        self.start_search()
+        arena = self.new_arena()
+        initial_state = self.puzzle.encode(self.puzzle.initial_state)
+        root = self.add_root(arena, initial_state)
+        if self.puzzle.is_solved(initial_state):
+            return self.finish_search(self.reconstruct_path(arena, root))
+
+        frontier = [root]
+        explored = self.new_explored_set(explored_set)
+        first_visit = self.first_visit(explored)
+        first_visit(initial_state)
 
         while frontier:
-            current_node = frontier.pop()
-            if self.puzzle.is_solved(current_node.board):
-                return self.reconstruct_path(current_node),len(explored)
+            current = frontier.pop()
+            if self.puzzle.is_solved(arena.states[current]):
+                return self.finish_search(self.reconstruct_path(arena, current))
+            self.count_expansion(len(frontier), len(explored))
+
+            for new_state, _, _, new_blank in self.expand(arena, current):
+                if not first_visit(new_state):
+                    self.stats.duplicates += 1
+                    continue
+                frontier.append(arena.add(new_state, current, arena.g[current] + 1, new_blank))
+                self.stats.generated += 1
+
+        return self.finish_search(None)  # No solution found
 
-            for neighbor in self.puzzle.get_neighbors(current_node):
-                if neighbor not in explored:
-                    frontier.append(neighbor)
-                    explored.add(neighbor)
+    def solve_dls(self, depth_limit=None):
+        # Memory is the current path only, so states reached by other paths are searched again
+        self.start_search()
+        if not self.puzzle.is_solvable():
+            return self.finish_search(None)  # The whole tree up to the limit would be searched in vain
+        if depth_limit is None:
+            if self.puzzle.size not in self.DEFAULT_DEPTH_LIMITS:
+                raise UnsupportedBoard(f"No default depth limit for {self.puzzle.size}x{self.puzzle.size} boards")
+            depth_limit = self.DEFAULT_DEPTH_LIMITS[self.puzzle.size]
+        board = [int(tile) for tile in self.puzzle.initial_state.flatten()]
+        state = self.puzzle.encode(self.puzzle.initial_state)
+        blank_path = [board.index(0)]
+        if self._dls_search(board, blank_path, {state}, state, depth_limit) is True:
+            return self.finish_search(self.replay_blank_path(blank_path))
+        return self.finish_search(None)  # No solution within the depth limit
 
-        return None,0  # No solution found
+    def solve_iddfs(self, max_depth=None):
+        # Depth-limited searches with limits 0, 1, 2, ..., so the first solution found is a shortest one
+        self.start_search()
+        if not self.puzzle.is_solvable():
+            return self.finish_search(None)  # Every limit would be searched in vain
+        board = [int(tile) for tile in self.puzzle.initial_state.flatten()]
+        state = self.puzzle.encode(self.puzzle.initial_state)
+        blank_path = [board.index(0)]
+
+        depth_limit = 0
+        while max_depth is None or depth_limit <= max_depth:
+            result = self._dls_search(board, blank_path, {state}, state, depth_limit)
+            if result is True:
+                return self.finish_search(self.replay_blank_path(blank_path))
+            if result == float('inf'):
+                return self.finish_search(None)  # Nothing was cut off, the whole space was searched
+            depth_limit = result
+        return self.finish_search(None)
+
+    def _dls_search(self, board, blank_path, on_path, state, depth_limit):
+        # True when solved, otherwise the depth of the first cut-off (inf if nothing was cut off)
+        if state == self.puzzle.goal:
+            return True
+        if len(blank_path) > depth_limit:
+            return len(blank_path)
+
+        self.count_expansion(len(blank_path), len(on_path))
+        minimum = float('inf')
+        blank = blank_path[-1]
+        previous = blank_path[-2] if len(blank_path) > 1 else None
+
+        for new_blank, _, new_shift, blank_shift in self.puzzle.move_table[blank]:
+            if new_blank == previous:  # Never undo the move that led here
+                continue
+
+            tile = board[new_blank]
+            new_state = state - (tile << new_shift) + (tile << blank_shift)
+            self.stats.generated += 1
+            if new_state in on_path:  # Longer cycles back onto the current path
+                self.stats.duplicates += 1
+                continue
+
+            board[blank], board[new_blank] = tile, 0
+            blank_path.append(new_blank)
+            on_path.add(new_state)
+
+            result = self._dls_search(board, blank_path, on_path, new_state, depth_limit)
+            if result is True:
+                return True
+
+            on_path.remove(new_state)
+            blank_path.pop()
+            board[blank], board[new_blank] = 0, tile
+            minimum = min(minimum, result)
+
+        return minimum
+
+    def solve_bidirectional(self):
+        self.start_search()
+        initial_state = self.puzzle.encode(self.puzzle.initial_state)
+        goal = self.puzzle.goal
+        if initial_state == goal:
+            return self.finish_search([self.puzzle.decode(goal)])
+        if self.puzzle.parity(initial_state) != self.puzzle.parity(goal):
+            return self.finish_search(None)  # The goal lies in the other half of the state space
+
+        parents = ({initial_state: None}, {goal: None})
+        frontiers = ([initial_state], [goal])
+        depths = [0, 0]
+
+        while frontiers[0] and frontiers[1]:
+            side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1  # Grow the smaller frontier
+            visited, other = parents[side], parents[1 - side]
+            next_frontier = []
+            best = None
+
+            # Finish the whole layer before stopping, the first meeting found is not always the shortest
+            for state in frontiers[side]:
+                self.count_expansion(len(frontiers[0]) + len(frontiers[1]) + len(next_frontier),
+                                     len(parents[0]) + len(parents[1]))
+                for neighbor in self.puzzle.neighbor_states(state):
+                    if neighbor in visited:
+                        self.stats.duplicates += 1
+                        continue
+                    visited[neighbor] = state
+                    next_frontier.append(neighbor)
+                    self.stats.generated += 1
+                    if neighbor in other:
+                        cost = depths[side] + len(self.parent_chain(other, neighbor))  # The chain includes neighbor itself
+                        if best is None or cost < best[0]:
+                            best = (cost, neighbor)
+
+            frontiers[side][:] = next_frontier
+            depths[side] += 1
+            if best is not None:
+                meeting = best[1]
+                forward = self.parent_chain(parents[0], meeting)[::-1]
+                backward = self.parent_chain(parents[1], meeting)[1:]
+                return self.finish_search([self.puzzle.decode(state) for state in forward + backward])
+
+        return self.finish_search(None)  # No solution found
+
+    def parent_chain(self, parents, state):
+        chain = []
+        while state is not None:
+            chain.append(state)
+            state = parents[state]
+        return chain
 
     def solve_astar(self):
-        initial_node = Node(self.puzzle.initial_state, h=self.puzzle.heuristic(self.puzzle.initial_state))
-        open_set = []
-        heapq.heappush(open_set, initial_node)
-        closed_set = set()
+        return self._astar(self.heuristic)
+
+    def solve_astar_eucleadian(self):
+        return self._astar("euclidean")
+
+    def _astar(self, heuristic):
+        table = self.puzzle.tile_table(heuristic)  # Without a table every child is evaluated in full
+        evaluate = self.puzzle.heuristic_function(heuristic)
+        if self.vectorized and heuristic not in TILE_DISTANCES:
+            raise ValueError(f"Heuristic {heuristic} has no per-tile distance to vectorize")
+        self.start_search()
+        arena = self.new_arena()
+        initial_state = self.puzzle.encode(self.puzzle.initial_state)
+        initial_h = self.timed(evaluate, initial_state)
+        open_set = [(initial_h, initial_h, self.add_root(arena, initial_state))]  # (f, h, node index), ties go to lower h
+        # Cheapest known cost per state, worse heap entries are skipped lazily. A state is only queued again
+        # at a strictly lower cost, so it needs no separate closed set
+        best_g = {initial_state: 0}
 
         while open_set:
-            current_node = heapq.heappop(open_set)
+            f, h, current = heapq.heappop(open_set)
+            state, g = arena.states[current], arena.g[current]
+            if g > best_g[state]:
+                continue
 
-            if self.puzzle.is_solved(current_node.board):
-                return self.reconstruct_path(current_node),len(open_set)
+            if self.puzzle.is_solved(state):
+                return self.finish_search(self.reconstruct_path(arena, current))
 
-            closed_set.add(current_node)
+            self.count_expansion(len(open_set), len(best_g))
 
-            for neighbor in self.puzzle.get_neighbors(current_node):
-                if neighbor in closed_set:
-                    continue
+            children = self.expand(arena, current, None if self.vectorized else table)
+            if self.vectorized:
+                scores = self.timed(self.puzzle.batch_heuristic, [child[0] for child in children], heuristic).tolist()
 
-                neighbor.g = current_node.g + 1
-                neighbor.h = self.puzzle.heuristic(neighbor.board)
-                neighbor.f = neighbor.g + neighbor.h
+            for position, (new_state, _, delta, new_blank) in enumerate(children):
+                if g + 1 >= best_g.get(new_state, float('inf')):
+                    self.stats.duplicates += 1
+                    continue
 
-                if neighbor not in open_set:
-                    heapq.heappush(open_set, neighbor)
+                best_g[new_state] = g + 1
+                if self.vectorized:
+                    new_h = scores[position]
+                elif table is not None:
+                    new_h = h + delta
                 else:
-                    for open_node in open_set:
-                        if neighbor == open_node and neighbor.g < open_node.g:
-                            open_node.g = neighbor.g
-                            open_node.f = neighbor.f
-                            open_node.parent = current_node
-                            break
+                    new_h = self.timed(evaluate, new_state)
+                heapq.heappush(open_set, (g + 1 + new_h, new_h, arena.add(new_state, current, g + 1, new_blank)))
+                self.stats.generated += 1
 
-        return None,0  # No solution found
+        return self.finish_search(None)  # No solution found
 
-    def solve_astar_eucleadian(self):
-        initial_node = Node(self.puzzle.initial_state, h=self.puzzle.heuristic(self.puzzle.initial_state))
-        open_set = []
-        heapq.heappush(open_set, initial_node)
-        closed_set = set()
+    def solve_epeastar(self):
+        # Enhanced partial expansion A*: a node only generates the children whose f equals its stored F, then
+        # goes back on the heap with the smallest larger child f, so surplus children never enter the heap
+        table = self.puzzle.tile_table(self.heuristic)
+        if table is None:
+            raise ValueError(f"Heuristic {self.heuristic} has no distance table for per-move deltas")
+        self.start_search()
+        arena = self.new_arena()
+        initial_state = self.puzzle.encode(self.puzzle.initial_state)
+        initial_h = self.timed(self.puzzle.table_heuristic, initial_state, table)
+        open_set = [(initial_h, initial_h, self.add_root(arena, initial_state))]  # (stored F, h, node index)
+        best_g = {initial_state: 0}
+        mask = self.puzzle.mask
+        epsilon = 1e-9  # Euclidean tables give float f values
 
         while open_set:
-            current_node = heapq.heappop(open_set)
+            stored_f, h, current = heapq.heappop(open_set)
+            state, g = arena.states[current], arena.g[current]
+            if g > best_g[state]:
+                continue  # Reached more cheaply since it was queued
 
-            if self.puzzle.is_solved(current_node.board):
-                return self.reconstruct_path(current_node),len(open_set)
+            if self.puzzle.is_solved(state):
+                return self.finish_search(self.reconstruct_path(arena, current))
 
-            closed_set.add(current_node)
+            self.count_expansion(len(open_set), len(best_g))
+            blank = arena.blanks[current]
+            skip_blank = self.parent_blank(arena, current)
+            next_f = float('inf')
 
-            for neighbor in self.puzzle.get_neighbors(current_node):
-                if neighbor in closed_set:
+            for new_blank, _, new_shift, blank_shift in self.puzzle.move_table[blank]:
+                if new_blank == skip_blank:
                     continue
+                # The f of a move is known from the moved tile alone, before the child is built
+                tile = (state >> new_shift) & mask
+                new_h = h + table[tile][blank] - table[tile][new_blank]
+                new_f = g + 1 + new_h
+                if new_f > stored_f + epsilon:
+                    next_f = min(next_f, new_f)  # Deferred to a later expansion of this node
+                    continue
+                if new_f < stored_f - epsilon:
+                    continue  # Generated by an earlier expansion with a lower stored F
+
+                new_state = state - (tile << new_shift) + (tile << blank_shift)
+                if g + 1 >= best_g.get(new_state, float('inf')):
+                    self.stats.duplicates += 1
+                    continue
+                best_g[new_state] = g + 1
+                heapq.heappush(open_set, (new_f, new_h, arena.add(new_state, current, g + 1, new_blank)))
+                self.stats.generated += 1
+
+            if next_f != float('inf'):
+                heapq.heappush(open_set, (next_f, h, current))
 
-                neighbor.g = current_node.g + 1
-                neighbor.h = self.puzzle.heuristic_2(neighbor.board)
-                neighbor.f = neighbor.g + neighbor.h
+        return self.finish_search(None)  # No solution found
 
-                if neighbor not in open_set:
-                    heapq.heappush(open_set, neighbor)
+    def solve_hdastar(self, workers=None):
+        # Hash-distributed A*: every state is expanded by the worker process that owns its hash
+        self.start_search()
+        if not self.puzzle.is_solvable():
+            return self.finish_search(None)
+
+        def on_poll(totals):
+            self.stats.generated = totals[GENERATED]
+            self.stats.duplicates = totals[DUPLICATES]
+            self.count_expansions(totals[EXPANDED] - self.stats.expanded, totals[PEAK_OPEN], totals[PEAK_CLOSED])
+
+        states = hda_star(self.puzzle, self.heuristic, workers or os.cpu_count(), on_poll)
+        if states is None:
+            return self.finish_search(None)
+        return self.finish_search([self.puzzle.decode(state) for state in states])
+
+    def solve_arastar(self, time_budget=None, initial_weight=3.0, weight_step=0.5):
+        # Anytime weighted A*: solve fast with a high weight, then lower it and repair until the deadline
+        self.start_search()
+        if time_budget is None:
+            time_budget = self.time_limit if self.time_limit is not None else 1.0
+        self.deadline = time.perf_counter() + time_budget
+        table = self.puzzle.tile_table(self.heuristic)
+        evaluate = self.puzzle.heuristic_function(self.heuristic)
+        arena = self.new_arena()
+        initial_state = self.puzzle.encode(self.puzzle.initial_state)
+        node_of = {initial_state: self.add_root(arena, initial_state)}  # Cheapest node found so far per state
+        if self.puzzle.is_solved(initial_state):
+            self.stats.suboptimality = 1.0
+            return self.finish_search(self.reconstruct_path(arena, node_of[initial_state]))
+        h_of = {initial_state: self.timed(evaluate, initial_state)}
+        weight = initial_weight
+        open_set = [(weight * h_of[initial_state], h_of[initial_state], node_of[initial_state])]
+        open_states = {initial_state}
+        closed_set = set()
+        inconsistent = set()  # Improved after being closed, carried into the next iteration instead of reopened
+        incumbent = None
+        proven_weight = None
+
+        try:
+            while True:
+                while open_set:
+                    key, h, current = open_set[0]
+                    state = arena.states[current]
+                    if state not in open_states or node_of[state] != current:
+                        heapq.heappop(open_set)  # Superseded by a cheaper node or a rebuilt heap
+                        continue
+                    if incumbent is not None and arena.g[incumbent] <= key:
+                        break  # The incumbent is within the current weight of the optimum
+
+                    heapq.heappop(open_set)
+                    open_states.remove(state)
+                    closed_set.add(state)
+                    self.count_expansion(len(open_states), len(closed_set))
+                    g = arena.g[current]
+
+                    for new_state, _, delta, new_blank in self.expand(arena, current, table):
+                        existing = node_of.get(new_state)
+                        if existing is not None and arena.g[existing] <= g + 1:
+                            self.stats.duplicates += 1
+                            continue
+                        if new_state not in h_of:
+                            h_of[new_state] = h + delta if table is not None else self.timed(evaluate, new_state)
+                        node_of[new_state] = arena.add(new_state, current, g + 1, new_blank)
+                        self.stats.generated += 1
+                        if new_state == self.puzzle.goal:
+                            incumbent = node_of[new_state]
+                        if new_state in closed_set:
+                            inconsistent.add(new_state)
+                        else:
+                            open_states.add(new_state)
+                            heapq.heappush(open_set, (g + 1 + weight * h_of[new_state], h_of[new_state], node_of[new_state]))
+
+                if incumbent is None:
+                    return self.finish_search(None)  # No solution found
+
+                proven_weight = weight
+                self.stats.suboptimality = self.arastar_bound(arena, node_of, h_of, open_states | inconsistent, incumbent, proven_weight)
+                if self.stats.suboptimality <= 1.0 or not open_states | inconsistent:
+                    break
+
+                # Lower the weight and continue from the current search tree rather than starting over
+                weight = max(1.0, weight - weight_step)
+                open_states |= inconsistent
+                inconsistent.clear()
+                closed_set.clear()
+                open_set = [(arena.g[node_of[state]] + weight * h_of[state], h_of[state], node_of[state]) for state in open_states]
+                heapq.heapify(open_set)
+        except SearchLimitExceeded:
+            if incumbent is None:
+                raise
+            # A cheaper incumbent found mid-iteration keeps the last proven ratio
+            self.stats.suboptimality = self.arastar_bound(arena, node_of, h_of, open_states | inconsistent, incumbent, proven_weight)
+
+        return self.finish_search(self.reconstruct_path(arena, incumbent))
+
+    def arastar_bound(self, arena, node_of, h_of, frontier, incumbent, weight):
+        # Every unexpanded path runs through the frontier, so its cheapest g + h is a lower bound on the optimum
+        if not frontier:
+            return 1.0
+        lower_bound = min(arena.g[node_of[state]] + h_of[state] for state in frontier)
+        ratio = max(1.0, arena.g[incumbent] / lower_bound) if lower_bound > 0 else 1.0
+        return min(weight, ratio) if weight is not None else ratio
+
+    def solve_beam(self, width=1000, window=2, max_depth=None):
+        # Keeps only the width best children of each depth by heuristic, not optimal but memory is bounded:
+        # states are held for the live beam and the last window layers only, older nodes keep parent and move.
+        # window=None never forgets a state, which stops the beam cycling on a plateau at the cost of memory.
+        # After max_depth layers (20 per cell by default, several times the paths it finds) it gives up
+        self.start_search()
+        if max_depth is None:
+            max_depth = 20 * self.puzzle.cells
+        if not self.puzzle.is_solvable():
+            return self.finish_search(None)
+        evaluate = self.puzzle.heuristic_function(self.heuristic)
+        initial_state = self.puzzle.encode(self.puzzle.initial_state)
+        if self.puzzle.is_solved(initial_state):
+            return self.finish_search([self.puzzle.initial_state.copy()])
+        parents = array('i', [-1])  # 5 bytes per kept node, enough to replay the path at the end
+        moves = array('b', [-1])
+        beam = [(0, initial_state, self.puzzle.find_blank(initial_state), -1)]  # (node, state, blank, parent's blank)
+        recent = {initial_state}  # States of the last window kept layers
+        recent_layers = deque([[initial_state]])
+        depth = 0
+
+        while beam and depth < max_depth:
+            depth += 1
+            candidates = []  # (state, parent, move, blank, parent's blank) of every new child of the layer
+            layer = set()
+            for index, state, blank, previous in beam:
+                self.count_expansion(len(beam), len(recent))
+                for new_state, move, _, new_blank in self.puzzle.successors(state, None, blank, previous):
+                    if new_state in layer or new_state in recent:
+                        self.stats.duplicates += 1
+                        continue
+                    if self.puzzle.is_solved(new_state):
+                        parents.append(index)
+                        moves.append(move)
+                        return self.finish_search(self.replay_moves(parents, moves, len(parents) - 1))
+                    layer.add(new_state)
+                    candidates.append((new_state, index, move, new_blank, blank))
+
+            if len(candidates) > width:
+                states = [candidate[0] for candidate in candidates]
+                if self.heuristic in TILE_DISTANCES:
+                    scores = self.timed(self.puzzle.batch_heuristic, states, self.heuristic)
                 else:
-                    for open_node in open_set:
-                        if neighbor == open_node and neighbor.g < open_node.g:
-                            open_node.g = neighbor.g
-                            open_node.f = neighbor.f
-                            open_node.parent = current_node
-                            break
+                    scores = np.array([self.timed(evaluate, state) for state in states])
+                candidates = [candidates[position] for position in np.argpartition(scores, width)[:width]]
+
+            beam = []
+            for new_state, parent, move, new_blank, previous in candidates:
+                parents.append(parent)
+                moves.append(move)
+                beam.append((len(parents) - 1, new_state, new_blank, previous))
+            kept = [new_state for _, new_state, _, _ in beam]
+            recent.update(kept)
+            if window is not None:
+                recent_layers.append(kept)
+                if len(recent_layers) > window:
+                    recent.difference_update(recent_layers.popleft())
+            self.stats.generated += len(beam)
 
-        return None,0  # No solution found
+        return self.finish_search(None)  # Every kept state ran into a dead end, or the depth cap was reached
 
-    def reconstruct_path(self, node):
-        path = []
-        while node:
-            path.append(node.board)
-            node = node.parent
+    def solve_idastar(self):
+        self.start_search()
+        if not self.puzzle.is_solvable():
+            return self.finish_search(None)  # Move pruning does not bound the depth, the bound would grow forever
+        self.table = self.puzzle.tile_table(self.heuristic)
+        self.evaluate = self.puzzle.heuristic_function(self.heuristic)
+        board = [int(tile) for tile in self.puzzle.initial_state.flatten()]  # Mutated in place by the search
+        state = self.puzzle.encode(self.puzzle.initial_state)
+        h = self.timed(self.evaluate, state)
+        blank_path = [board.index(0)]  # Blank cell after every move on the current path
 
-        return path[::-1]
+        bound = h
+        while True:
+            result = self._idastar_search(board, blank_path, state, 0, h, bound)
+            if result is True:
+                return self.finish_search(self.replay_blank_path(blank_path))
+            if result == float('inf'):
+                return self.finish_search(None)  # No solution found
+            bound = result
+
+    def _idastar_search(self, board, blank_path, state, g, h, bound):
+        f = g + h
+        if f > bound:
+            return f
+        if state == self.puzzle.goal:
+            return True
+
+        self.count_expansion(len(blank_path))  # The only frontier IDA* keeps is the current path
+        minimum = float('inf')
+        blank = blank_path[-1]
+        previous = blank_path[-2] if len(blank_path) > 1 else None
+
+        for new_blank, _, new_shift, blank_shift in self.puzzle.move_table[blank]:
+            if new_blank == previous:  # Never undo the move that led here
+                continue
+
+            tile = board[new_blank]
+            board[blank], board[new_blank] = tile, 0
+            blank_path.append(new_blank)
+            self.stats.generated += 1
+            new_state = state - (tile << new_shift) + (tile << blank_shift)
+            if self.table is not None:
+                new_h = h + self.table[tile][blank] - self.table[tile][new_blank]
+            else:
+                new_h = self.timed(self.evaluate, new_state)
+
+            result = self._idastar_search(board, blank_path, new_state, g + 1, new_h, bound)
+            if result is True:
+                return True
+
+            blank_path.pop()
+            board[blank], board[new_blank] = 0, tile
+            minimum = min(minimum, result)
+
+        return minimum
+
+    def solve_table(self):
+        # 3x3 only: the table is built once per goal, after that a query is a walk of depth lookups
+        self.start_search()
+        if self.puzzle.distance_table is None:
+            self.puzzle.load_distance_table()
+        path = self.puzzle.distance_table.path_from(self.puzzle.initial_state)
+        if path is not None:
+            self.stats.expanded = len(path) - 1
+        return self.finish_search(path)
+
+    def replay_moves(self, parents, moves, index):
+        codes = []
+        while parents[index] != -1:
+            codes.append(moves[index])
+            index = parents[index]
+        blank_path = [self.puzzle.find_blank(self.puzzle.encode(self.puzzle.initial_state))]
+        for move in reversed(codes):
+            dr, dc = MOVES[move]
+            blank_path.append(blank_path[-1] + dr * self.puzzle.size + dc)
+        return self.replay_blank_path(blank_path)
+
+    def replay_blank_path(self, blank_path):
+        board = self.puzzle.initial_state.flatten()
+        path = [board.reshape(self.puzzle.size, self.puzzle.size).copy()]
+        for blank, new_blank in zip(blank_path, blank_path[1:]):
+            board[blank], board[new_blank] = board[new_blank], 0
+            path.append(board.reshape(self.puzzle.size, self.puzzle.size).copy())
+        return path
+
+    def reconstruct_path(self, arena, index):
+        states = []
+        while index != -1:
+            states.append(arena.states[index])
+            index = arena.parents[index]
+
+        # Boards stay packed during the search and are only expanded to arrays here
+        return [self.puzzle.decode(state) for state in reversed(states)]
 
 if __name__ == "__main__":
     initial_state = [
@@ -259,3 +1116,12 @@ if __name__ == "__main__":
         print(aexp2)
     else:
         print("No solution found.")
+
+    print("\nIDA* Solution:")
+    solution,iexp = solver.solve_idastar()
+    if solution:
+        for step in solution:
+            print(step)
+        print(iexp)
+    else:
+        print("No solution found.")
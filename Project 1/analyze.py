@@ -32,14 +32,15 @@ bfs = []
 dfs = []
 Astar = []
 Astar_2 = []
+IDAstar = []
 for state in initial_states:
     puzzle = Puzzle(state, goal_state)
     solver = Solver(puzzle)
 
     start_time = time.time()
-    solution,bfs_exp = solver.solve_bfs()
+    solution,bfs_stats = solver.solve_bfs()
     end_time = time.time()
-    bfs.append((len(solution),abs(end_time-start_time),bfs_exp))
+    bfs.append((len(solution),abs(end_time-start_time),bfs_stats.expanded))
 
 
 
@@ -47,9 +48,9 @@ for state in initial_states:
     solver = Solver(puzzle)
 
     start_time = time.time()
-    solution,dfs_exp = solver.solve_dfs()
+    solution,dfs_stats = solver.solve_dfs()
     end_time = time.time()
-    dfs.append((len(solution),abs(end_time-start_time),dfs_exp))
+    dfs.append((len(solution),abs(end_time-start_time),dfs_stats.expanded))
 
 
 
@@ -57,21 +58,29 @@ for state in initial_states:
     solver = Solver(puzzle)
 
     start_time = time.time()
-    solution,astar_exp = solver.solve_astar()
+    solution,astar_stats = solver.solve_astar()
     end_time = time.time()
-    Astar.append((len(solution),abs(end_time-start_time),astar_exp))
+    Astar.append((len(solution),abs(end_time-start_time),astar_stats.expanded))
 
     puzzle = Puzzle(state, goal_state)
     solver = Solver(puzzle)
     start_time = time.time()
-    solution,astar2_exp = solver.solve_astar_eucleadian()
+    solution,astar2_stats = solver.solve_astar_eucleadian()
     end_time = time.time()
-    Astar_2.append((len(solution), abs(end_time - start_time),astar2_exp))
+    Astar_2.append((len(solution), abs(end_time - start_time),astar2_stats.expanded))
+
+    puzzle = Puzzle(state, goal_state)
+    solver = Solver(puzzle)
+    start_time = time.time()
+    solution,idastar_stats = solver.solve_idastar()
+    end_time = time.time()
+    IDAstar.append((len(solution), abs(end_time - start_time),idastar_stats.expanded))
 
 print("\nBFS path cost,time,no of explored for initial states respectively:",bfs)
 print("\nDFS path cost,time,no of explored for initial states respectively:",dfs)
 print("\nA* Manhaten path cost,time,no of explored for initial states respectively:",Astar)
 print("\nA* Eucleadean path cost,time,no of explored for initial states respectively:",Astar_2)
+print("\nIDA* Manhaten path cost,time,no of explored for initial states respectively:",IDAstar)
 
 
 # Extracting the data for plotting
@@ -79,12 +88,13 @@ bfs_lengths, bfs_times,bfs_exp = zip(*bfs)
 dfs_lengths, dfs_times,dfs_exp  = zip(*dfs)
 astar_lengths, astar_times ,ast_exp = zip(*Astar)
 astar_lengths_2, astar_times_2,ast2_exp  = zip(*Astar_2)
+idastar_lengths, idastar_times,idast_exp  = zip(*IDAstar)
 # Number of initial states
 N = len(initial_states)
 
 # Setting the positions and width for the bars
 ind = np.arange(N)
-width = 0.20
+width = 0.16
 
 # Plotting the data
 fig, (ax1, ax2, ax3) = plt.subplots(3, 1, figsize=(14, 10))
@@ -93,10 +103,11 @@ fig, (ax1, ax2, ax3) = plt.subplots(3, 1, figsize=(14, 10))
 ax1.bar(ind - width, bfs_lengths, width, label='BFS')
 ax1.bar(ind + width, astar_lengths, width, label='A* Manhaten')
 ax1.bar(ind + width*2, astar_lengths_2, width, label='A* Eucleadean')
+ax1.bar(ind + width*3, idastar_lengths, width, label='IDA* Manhaten')
 
 ax1.set_ylabel('Number of Movements (log scale)')
 ax1.set_yscale('log')
-ax1.set_title('Number of Movements and Time Taken by BFS, DFS, and A* Algorithms')
+ax1.set_title('Number of Movements and Time Taken by BFS, DFS, A* and IDA* Algorithms')
 ax1.set_xticks(ind)
 ax1.set_xticklabels([f'State {i+1}' for i in range(N)])
 ax1.legend()
@@ -106,6 +117,7 @@ ax2.bar(ind - width, bfs_times, width, label='BFS')
 ax2.bar(ind, dfs_times, width, label='DFS')
 ax2.bar(ind + width, astar_times, width, label='A* Manhaten')
 ax2.bar(ind + width*2, astar_times_2, width, label='A* Eucleadean')
+ax2.bar(ind + width*3, idastar_times, width, label='IDA* Manhaten')
 
 ax2.set_ylabel('Time Taken (s)')
 ax2.set_xticks(ind)
@@ -116,6 +128,7 @@ ax3.bar(ind - width, bfs_exp, width, label='BFS')
 ax3.bar(ind, dfs_exp, width, label='DFS')
 ax3.bar(ind + width, ast_exp, width, label='A* Manhaten')
 ax3.bar(ind + width*2, ast2_exp, width, label='A* Eucleadean')
+ax3.bar(ind + width*3, idast_exp, width, label='IDA* Manhaten')
 
 ax3.set_ylabel('number of nodes explored')
 ax3.set_xticks(ind)
@@ -0,0 +1,59 @@
+import numpy as np
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from Solver import Puzzle, Solver, SearchLimitExceeded
+
+
+def solve_one(index, state, goal, algorithm, heuristic, timeout, node_limit):
+    puzzle = Puzzle(state, goal)
+    solver = Solver(puzzle, heuristic, node_limit=node_limit, time_limit=timeout)
+    start_time = time.perf_counter()
+    error = None
+    try:
+        path, _ = solver.solve(algorithm)
+        status = "solved" if path is not None else "unsolvable"
+    except SearchLimitExceeded:
+        path, status = None, "limit"
+    except Exception as exception:  # One failing instance must not abort the rest of the corpus
+        path, status, error = None, "error", f"{type(exception).__name__}: {exception}"
+
+    return {
+        "index": index,
+        "status": status,
+        "error": error,
+        "moves": len(path) - 1 if path is not None else None,
+        "expanded": solver.stats.expanded,
+        "time": time.perf_counter() - start_time,
+        "stats": solver.stats.as_dict(),
+        "path": path,
+    }
+
+
+def solve_many(states, goal, algorithm="astar", workers=None, timeout=None, node_limit=None, heuristic="manhattan"):
+    # Results are yielded as soon as each instance finishes, so they arrive out of order; use "index"
+    if algorithm not in Solver.ALGORITHMS:
+        raise ValueError(f"Unknown algorithm: {algorithm}")
+    goal = np.array(goal)
+    executor = ProcessPoolExecutor(max_workers=workers or os.cpu_count())
+    try:
+        futures = [executor.submit(solve_one, index, np.array(state), goal, algorithm, heuristic, timeout, node_limit)
+                   for index, state in enumerate(states)]
+        for future in as_completed(futures):
+            yield future.result()
+    finally:
+        # Stopping early (or an error) drops the instances that have not started yet
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+if __name__ == "__main__":
+    initial_states = [
+        [[6, 4, 2], [1, 3, 7], [0, 5, 8]],
+        [[0, 8, 3], [2, 1, 6], [4, 5, 7]],
+        [[1, 4, 2], [3, 5, 8], [0, 6, 7]],
+    ]
+    goal_state = [[1, 2, 3], [4, 5, 6], [7, 8, 0]]
+
+    for result in solve_many(initial_states, goal_state, "astar", timeout=10, node_limit=100000):
+        print(f"State {result['index'] + 1}: {result['status']}, moves={result['moves']}, "
+              f"expanded={result['expanded']}, time={result['time']:.3f}s")
@@ -0,0 +1,192 @@
+import argparse
+import csv
+import json
+import os
+import platform
+import random
+import statistics
+import time
+import tracemalloc
+from Solver import Puzzle, Solver, SearchLimitExceeded, UnsupportedBoard
+from generator import default_goal, random_walk
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CORPUS_PATH = os.path.join(HERE, "benchmark_corpus.json")
+CORPUS_VERSION = 1
+
+# Walk lengths used to build the corpus, the optimal depth of each instance is solved and stored
+CORPUS_WALKS = {
+    3: [4, 8, 12, 16, 20, 24, 28, 32],
+    4: [10, 20, 30, 40],
+}
+CORPUS_PER_WALK = 2
+CORPUS_SEED = 356
+
+# Expansion counts that vary between runs of the same tree: HDA* depends on process scheduling and ARA*
+# on how far the clock lets it lower the weight, so only their status and time are compared
+NONDETERMINISTIC_EXPANSIONS = {"hdastar", "arastar"}
+
+FIELDS = ["instance", "size", "depth", "algorithm", "heuristic", "status", "moves", "expanded", "generated",
+          "duplicates", "peak_open", "peak_closed", "heuristic_share", "peak_memory_kb", "time_median", "time_min",
+          "repeats"]
+
+
+def make_corpus():
+    rng = random.Random(CORPUS_SEED)
+    instances = []
+    for size, walks in CORPUS_WALKS.items():
+        goal_state = default_goal(size)
+        for walk in walks:
+            for copy in range(CORPUS_PER_WALK):
+                board = random_walk(goal_state, walk, rng)
+                path, _ = Solver(Puzzle(board, goal_state), "linear_conflict").solve_idastar()
+                instances.append({
+                    "name": f"{size}x{size}-walk{walk}-{copy}",
+                    "size": size,
+                    "depth": len(path) - 1,
+                    "initial": board.tolist(),
+                    "goal": goal_state.tolist(),
+                })
+    instances.sort(key=lambda instance: (instance["size"], instance["depth"]))
+    return {"version": CORPUS_VERSION, "seed": CORPUS_SEED, "instances": instances}
+
+
+def load_corpus(path):
+    with open(path) as file:
+        corpus = json.load(file)
+    if corpus.get("version") != CORPUS_VERSION:
+        raise ValueError(f"Corpus {path} has version {corpus.get('version')}, expected {CORPUS_VERSION}")
+    return corpus
+
+
+def run_once(instance, algorithm, heuristic, node_limit, time_limit):
+    solver = Solver(Puzzle(instance["initial"], instance["goal"]), heuristic,
+                    node_limit=node_limit, time_limit=time_limit)
+    start_time = time.perf_counter()
+    try:
+        path, _ = solver.solve(algorithm)
+        status = "solved" if path is not None else "unsolvable"
+    except SearchLimitExceeded:
+        path, status = None, "limit"
+    except UnsupportedBoard:
+        path, status = None, "unsupported"  # Size-specific modes such as the 3x3 distance table
+    return time.perf_counter() - start_time, solver, path, status
+
+
+def measure(instance, algorithm, heuristic, repeats, node_limit, time_limit):
+    # Timed runs go first and without tracemalloc, which slows allocation-heavy code several times over
+    times = []
+    for _ in range(repeats):
+        elapsed, solver, path, status = run_once(instance, algorithm, heuristic, node_limit, time_limit)
+        times.append(elapsed)
+        if status in ("limit", "unsupported"):
+            break  # Repeating a run that hit its budget only measures the budget
+
+    tracemalloc.start()
+    run_once(instance, algorithm, heuristic, node_limit, time_limit)
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "instance": instance["name"],
+        "size": instance["size"],
+        "depth": instance["depth"],
+        "algorithm": algorithm,
+        "heuristic": heuristic,
+        "status": status,
+        "moves": len(path) - 1 if path is not None else None,
+        "expanded": solver.stats.expanded,
+        "generated": solver.stats.generated,
+        "duplicates": solver.stats.duplicates,
+        "peak_open": solver.stats.peak_open,
+        "peak_closed": solver.stats.peak_closed,
+        "heuristic_share": round(solver.stats.heuristic_share, 4),
+        "peak_memory_kb": round(peak_memory / 1024, 1),
+        "time_median": statistics.median(times),
+        "time_min": min(times),
+        "repeats": len(times),
+    }
+
+
+def compare(results, baseline, tolerance, noise_floor=0.005):
+    # A run regresses if it got slower beyond the tolerance, searched more, or stopped solving. Slowdowns
+    # under noise_floor seconds are ignored, sub-millisecond runs easily vary by that much between runs
+    previous = {(row["instance"], row["algorithm"], row["heuristic"]): row for row in baseline["results"]}
+    regressions = []
+    for row in results:
+        old = previous.get((row["instance"], row["algorithm"], row["heuristic"]))
+        if old is None:
+            continue
+        reasons = []
+        if old["status"] == "solved" and row["status"] != "solved":
+            reasons.append(f"status {old['status']} -> {row['status']}")
+        slowdown = row["time_median"] - old["time_median"]
+        if slowdown > old["time_median"] * tolerance and slowdown > noise_floor:
+            reasons.append(f"time {old['time_median']:.4f}s -> {row['time_median']:.4f}s")
+        if row["algorithm"] not in NONDETERMINISTIC_EXPANSIONS and old["expanded"] is not None \
+                and row["expanded"] > old["expanded"]:
+            reasons.append(f"expanded {old['expanded']} -> {row['expanded']}")
+        if reasons:
+            regressions.append((row, reasons))
+    return regressions
+
+
+def write_results(results, prefix):
+    report = {
+        "corpus_version": CORPUS_VERSION,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+    with open(f"{prefix}.json", "w") as file:
+        json.dump(report, file, indent=2)
+    with open(f"{prefix}.csv", "w", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(results)
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the N-puzzle solvers on the fixed corpus")
+    parser.add_argument("--algorithms", nargs="+", default=list(Solver.ALGORITHMS), choices=list(Solver.ALGORITHMS))
+    parser.add_argument("--heuristic", default="manhattan")
+    parser.add_argument("--sizes", nargs="+", type=int, help="Only run instances of these board sizes")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--node-limit", type=int, default=500000)
+    parser.add_argument("--time-limit", type=float, default=30.0)
+    parser.add_argument("--output", default="benchmark_results", help="Prefix of the .json and .csv reports")
+    parser.add_argument("--baseline", help="Earlier .json report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown")
+    parser.add_argument("--noise-floor", type=float, default=0.005, help="Slowdowns in seconds always allowed")
+    parser.add_argument("--make-corpus", action="store_true", help="Regenerate benchmark_corpus.json and exit")
+    args = parser.parse_args()
+
+    if args.make_corpus:
+        with open(CORPUS_PATH, "w") as file:
+            json.dump(make_corpus(), file, indent=1)
+        print(f"Wrote {CORPUS_PATH}")
+        raise SystemExit
+
+    corpus = load_corpus(CORPUS_PATH)
+    results = []
+    for instance in corpus["instances"]:
+        if args.sizes and instance["size"] not in args.sizes:
+            continue
+        for algorithm in args.algorithms:
+            row = measure(instance, algorithm, args.heuristic, args.repeats, args.node_limit, args.time_limit)
+            results.append(row)
+            print(f"{row['instance']:<16} {algorithm:<16} {row['status']:<10} moves={row['moves']} "
+                  f"expanded={row['expanded']} time={row['time_median']:.4f}s mem={row['peak_memory_kb']}KB")
+
+    write_results(results, args.output)
+    print(f"Wrote {args.output}.json and {args.output}.csv")
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(results, json.load(file), args.tolerance, args.noise_floor)
+        for row, reasons in regressions:
+            print(f"REGRESSION {row['instance']} {row['algorithm']}: {', '.join(reasons)}")
+        if regressions:
+            raise SystemExit(1)
+        print("No regressions against the baseline")
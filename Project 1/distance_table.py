@@ -0,0 +1,89 @@
+import numpy as np
+import math
+import os
+from grid import UnsupportedBoard, adjacent_cells, goal_digest, load_table
+from pattern_db import DEFAULT_DIRECTORY, UNKNOWN
+
+
+def lehmer_rank(tiles):
+    # Position of the permutation in lexicographic order, a perfect hash onto 0 .. n! - 1
+    rank = 0
+    for i, tile in enumerate(tiles):
+        smaller_after = sum(1 for other in tiles[i + 1:] if other < tile)
+        rank = rank * (len(tiles) - i) + smaller_after
+    return rank
+
+
+def lehmer_ranks(boards):
+    # lehmer_rank for every row of a (states, cells) array at once
+    cells = boards.shape[1]
+    smaller_after = np.triu(boards[:, :, None] > boards[:, None, :], k=1).sum(axis=2)
+    weights = np.array([math.factorial(cells - 1 - i) for i in range(cells)], dtype=np.int64)
+    return smaller_after.astype(np.int64) @ weights
+
+
+class DistanceTable:
+    # Exact distance to the goal for every 3x3 board, one byte per Lehmer rank
+    def __init__(self, goal_state, directory=DEFAULT_DIRECTORY):
+        self.goal_state = np.asarray(goal_state)
+        self.size = self.goal_state.shape[0]
+        if self.size != 3:
+            raise UnsupportedBoard(f"A full distance table is only practical for 3x3 boards, not {self.size}x{self.size}")
+        self.cells = self.size * self.size
+        self.adjacent = [[cell for cell in cells if cell >= 0] for cells in adjacent_cells(self.size).tolist()]
+        self.path = os.path.join(directory, self.file_name())
+        self.table = load_table(self.path, self.build)
+
+    def file_name(self):
+        return f"distance_{self.size}x{self.size}_{goal_digest(self.goal_state)}.npy"
+
+    def build(self):
+        # Retrograde BFS from the goal, a whole layer of boards is moved and ranked at a time
+        table = np.full(math.factorial(self.cells), UNKNOWN, dtype=np.uint8)
+        frontier = self.goal_state.reshape(1, -1).astype(np.int8)
+        table[lehmer_ranks(frontier)] = 0
+        depth = 0
+
+        while len(frontier):
+            depth += 1
+            blanks = np.argmin(frontier, axis=1)
+            children = []
+            for index in range(self.cells):
+                boards = frontier[blanks == index]
+                for new_blank in self.adjacent[index]:
+                    moved = boards.copy()
+                    moved[:, index] = moved[:, new_blank]
+                    moved[:, new_blank] = 0
+                    children.append(moved)
+            children = np.concatenate(children)
+            ranks, first = np.unique(lehmer_ranks(children), return_index=True)
+            new = table[ranks] == UNKNOWN
+            table[ranks[new]] = depth
+            frontier = children[first[new]]
+
+        return table
+
+    def distance(self, board):
+        # None when the board is in the other parity class and can never reach the goal
+        distance = int(self.table[lehmer_rank(np.asarray(board).flatten().tolist())])
+        return distance if distance != UNKNOWN else None
+
+    def path_from(self, board):
+        # Each step moves to any neighbour one closer to the goal, so the walk is O(depth) lookups
+        tiles = np.asarray(board).flatten().tolist()
+        distance = int(self.table[lehmer_rank(tiles)])
+        if distance == UNKNOWN:
+            return None
+
+        path = [np.array(tiles).reshape(self.size, self.size)]
+        blank = tiles.index(0)
+        while distance > 0:
+            for new_blank in self.adjacent[blank]:
+                tiles[blank], tiles[new_blank] = tiles[new_blank], 0
+                if self.table[lehmer_rank(tiles)] == distance - 1:
+                    break
+                tiles[new_blank], tiles[blank] = tiles[blank], 0
+            blank = new_blank
+            distance -= 1
+            path.append(np.array(tiles).reshape(self.size, self.size))
+        return path
@@ -0,0 +1,164 @@
+import numpy as np
+import heapq
+import os
+from grid import UnsupportedBoard, adjacent_cells
+
+
+def open_states(path):
+    # Sorted uint64 states on disk, paged in by the OS instead of loaded
+    if os.path.getsize(path) == 0:
+        return np.empty(0, dtype=np.uint64)
+    return np.memmap(path, dtype=np.uint64, mode="r")
+
+
+def contains(sorted_states, states):
+    if len(sorted_states) == 0:
+        return np.zeros(len(states), dtype=bool)
+    positions = np.searchsorted(sorted_states, states)
+    return sorted_states[np.minimum(positions, len(sorted_states) - 1)] == states
+
+
+def stream(path, block_size):
+    states = open_states(path)
+    for start in range(0, len(states), block_size):
+        yield from states[start:start + block_size].tolist()
+
+
+class LayerCursor:
+    # Forward-only reader of a sorted layer file. Queries come in ascending order, so the file is read
+    # once front to back, one block at a time, however much larger than memory it is
+    def __init__(self, path, block_size):
+        self.states = open_states(path) if path is not None else np.empty(0, dtype=np.uint64)
+        self.block_size = block_size
+        self.position = 0
+        self.block = np.empty(0, dtype=np.uint64)
+
+    def contains(self, states):
+        # states must be sorted and no smaller than those of earlier calls
+        found = np.zeros(len(states), dtype=bool)
+        start = 0
+        while start < len(states):
+            if len(self.block):
+                end = np.searchsorted(states, self.block[-1], side="right")  # Queries this block can answer
+                found[start:end] = contains(self.block, states[start:end])
+                start = end
+            if start < len(states):
+                if self.position >= len(self.states):
+                    break  # The rest are larger than every state in the layer
+                self.block = np.array(self.states[self.position:self.position + self.block_size])
+                self.position += self.block_size
+        return found
+
+
+class ExternalBFS:
+    # Layered BFS whose frontier and duplicate detection live in sorted binary files, one per depth
+    def __init__(self, puzzle, directory, buffer_size=1000000):
+        if puzzle.cells * puzzle.bits > 64:
+            raise UnsupportedBoard("External BFS needs states that pack into 64 bits (boards up to 4x4)")
+        self.puzzle = puzzle
+        self.adjacent = adjacent_cells(puzzle.size)
+        self.directory = directory
+        self.buffer_size = buffer_size  # Maximum number of states held in memory at once
+        self.layer_sizes = []
+        self.duplicates = 0  # Successors dropped by the merge, within a layer or against the two before it
+        os.makedirs(directory, exist_ok=True)
+
+    def layer_path(self, depth):
+        return os.path.join(self.directory, f"layer_{depth}.bin")
+
+    def successor_array(self, states):
+        puzzle = self.puzzle
+        boards = puzzle.decode_many(states)
+        blanks = np.argmin(boards, axis=1)  # The blank is the only 0
+        bits = np.uint64(puzzle.bits)
+        children = []
+        for move in range(self.adjacent.shape[1]):
+            new_blanks = self.adjacent[blanks, move]
+            valid = new_blanks >= 0
+            new_blanks = new_blanks[valid]
+            tiles = boards[valid, new_blanks].astype(np.uint64)
+            children.append(states[valid] - (tiles << (new_blanks.astype(np.uint64) * bits))
+                            + (tiles << (blanks[valid].astype(np.uint64) * bits)))
+        return np.concatenate(children)
+
+    def expand_layer(self, depth, on_chunk=None):
+        # Sorted, de-duplicated runs of successors, each small enough for the buffer
+        layer = open_states(self.layer_path(depth))
+        chunk_size = max(1, self.buffer_size // 4)  # A state has at most four successors
+        run_paths = []
+        for start in range(0, len(layer), chunk_size):
+            chunk = np.asarray(layer[start:start + chunk_size])
+            children = self.successor_array(chunk)
+            if on_chunk is not None:
+                on_chunk(len(chunk), len(children), len(layer))
+            run_path = os.path.join(self.directory, f"run_{depth + 1}_{len(run_paths)}.bin")
+            run = np.unique(children)
+            self.duplicates += len(children) - len(run)
+            run.tofile(run_path)
+            run_paths.append(run_path)
+        return run_paths
+
+    def merge_layer(self, depth, run_paths, stop_state=None):
+        # Streams the merged runs, dropping states already seen at depth or depth - 1 (undirected graph).
+        # The merged stream is sorted, so both layers are checked by reading them alongside it sequentially
+        block_size = max(1, self.buffer_size // max(1, len(run_paths) + 3))
+        current = LayerCursor(self.layer_path(depth), block_size)
+        previous = LayerCursor(self.layer_path(depth - 1) if depth > 0 else None, block_size)
+        merged = 0
+        count = 0
+        found = False
+        buffer = []
+        last = None
+
+        with open(self.layer_path(depth + 1), "wb") as output:
+            def flush():
+                nonlocal count, found
+                block = np.array(buffer, dtype=np.uint64)
+                fresh = block[~(current.contains(block) | previous.contains(block))]
+                fresh.tofile(output)
+                count += len(fresh)
+                if stop_state is not None and np.any(fresh == np.uint64(stop_state)):
+                    found = True
+                buffer.clear()
+
+            for state in heapq.merge(*(stream(path, block_size) for path in run_paths)):
+                merged += 1
+                if state != last:  # Equal states from different runs arrive next to each other
+                    buffer.append(state)
+                    last = state
+                    if len(buffer) >= self.buffer_size:
+                        flush()
+            if buffer:
+                flush()
+
+        for path in run_paths:
+            os.remove(path)
+        self.duplicates += merged - count
+        return count, found
+
+    def run(self, initial_state, stop_state=None, max_depth=None, on_chunk=None):
+        # Writes layer_0 .. layer_d and returns the depth of stop_state, or None once the space is exhausted
+        np.array([initial_state], dtype=np.uint64).tofile(self.layer_path(0))
+        self.layer_sizes = [1]
+        self.duplicates = 0
+        if stop_state == initial_state:
+            return 0
+
+        depth = 0
+        while self.layer_sizes[-1] > 0 and (max_depth is None or depth < max_depth):
+            run_paths = self.expand_layer(depth, on_chunk)
+            count, found = self.merge_layer(depth, run_paths, stop_state)
+            self.layer_sizes.append(count)
+            depth += 1
+            if found:
+                return depth
+        return None
+
+    def path_to(self, state, depth):
+        # Walks back one layer at a time, each step needs only a neighbour lookup in the layer above
+        path = [state]
+        for layer_depth in range(depth - 1, -1, -1):
+            layer = open_states(self.layer_path(layer_depth))
+            neighbors = np.array(self.puzzle.neighbor_states(path[-1]), dtype=np.uint64)
+            path.append(int(neighbors[contains(layer, neighbors)][0]))
+        return path[::-1]
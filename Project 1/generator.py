@@ -0,0 +1,68 @@
+import numpy as np
+import argparse
+import random
+from grid import adjacent_cells
+from Solver import board_parity
+
+
+def default_goal(size):
+    return np.arange(size * size).reshape(size, size)
+
+
+def random_walk(board, depth, rng=random):
+    # Slides the blank depth times without search nodes, never straight back to where it came from
+    board = np.asarray(board)
+    size = board.shape[0]
+    adjacent = adjacent_cells(size).tolist()
+    tiles = board.flatten().tolist()
+    blank = tiles.index(0)
+    previous = None
+
+    for _ in range(depth):
+        moves = [cell for cell in adjacent[blank] if cell >= 0 and cell != previous]
+        new_blank = rng.choice(moves)
+        tiles[blank], tiles[new_blank] = tiles[new_blank], 0
+        previous, blank = blank, new_blank
+
+    return np.array(tiles).reshape(size, size)
+
+
+def solvable_instances(size, count, seed=None, goal_state=None):
+    rng = random.Random(seed)
+    goal_state = default_goal(size) if goal_state is None else np.asarray(goal_state)
+    goal_parity = board_parity(goal_state.flatten().tolist(), size)
+
+    for _ in range(count):
+        tiles = list(range(size * size))
+        rng.shuffle(tiles)
+        if board_parity(tiles, size) != goal_parity:
+            # Swapping two non-blank tiles flips the parity without moving the blank
+            i, j = [index for index, tile in enumerate(tiles) if tile != 0][:2]
+            tiles[i], tiles[j] = tiles[j], tiles[i]
+        yield np.array(tiles).reshape(size, size)
+
+
+def random_walk_instances(size, count, depth, seed=None, goal_state=None):
+    # depth bounds the optimal solution length from above, short walks can fold back on themselves
+    rng = random.Random(seed)
+    goal_state = default_goal(size) if goal_state is None else np.asarray(goal_state)
+    for _ in range(count):
+        yield random_walk(goal_state, depth, rng)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a corpus of solvable N-puzzle instances")
+    parser.add_argument("size", type=int)
+    parser.add_argument("count", type=int)
+    parser.add_argument("output", help="Path of the .npy file to write")
+    parser.add_argument("--depth", type=int, help="Random-walk length instead of uniform random boards")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.depth is None:
+        instances = solvable_instances(args.size, args.count, args.seed)
+    else:
+        instances = random_walk_instances(args.size, args.count, args.depth, args.seed)
+    corpus = np.stack(list(instances))
+    np.save(args.output, corpus)
+    print(f"Wrote {len(corpus)} {args.size}x{args.size} instances to {args.output}")
@@ -0,0 +1,37 @@
+import numpy as np
+import hashlib
+import os
+
+MOVES = [(-1, 0), (1, 0), (0, -1), (0, 1)]  # Up, down, left, right, indexed by move code
+
+
+class UnsupportedBoard(ValueError):
+    # The mode or heuristic only exists for some board sizes, unlike other ValueErrors this is not a bug
+    pass
+
+
+def adjacent_cells(size):
+    # (cells, 4) array of the cell the blank reaches with each move code, -1 where the move leaves the board
+    rows, columns = np.divmod(np.arange(size * size), size)
+    adjacent = np.full((size * size, len(MOVES)), -1, dtype=np.int64)
+    for move, (dr, dc) in enumerate(MOVES):
+        valid = (rows + dr >= 0) & (rows + dr < size) & (columns + dc >= 0) & (columns + dc < size)
+        adjacent[valid, move] = (rows[valid] + dr) * size + columns[valid] + dc
+    return adjacent
+
+
+def goal_digest(goal_state):
+    # Short stable name for a goal board, tables for different goals never share a file
+    return hashlib.sha1(np.asarray(goal_state).flatten().astype(np.int64).tobytes()).hexdigest()[:10]
+
+
+def load_table(path, build):
+    # Memory-maps the table at path, saving build() there first if it is missing. Written under a temporary
+    # name so concurrent builders never see a partial file; read-only, so every process shares the same pages
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        table = build()
+        temporary_path = f"{path}.{os.getpid()}.tmp.npy"
+        np.save(temporary_path, table)
+        os.replace(temporary_path, path)
+    return np.load(path, mmap_mode="r")
@@ -1,9 +1,17 @@
 import pygame
 import numpy as np
-import random
-import time
+import threading
 from collections import deque
-from Solver import Node, Puzzle, Solver
+from Solver import Puzzle, Solver
+from generator import random_walk
+from solution_cache import SolutionCache
+
+SOLVER_ALGORITHMS = {"BFS": "bfs", "DFS": "dfs", "A*": "astar", "IDA*": "idastar"}
+OPTIMAL_SOLVERS = {"BFS", "A*", "IDA*"}  # Only their paths are cached, DFS paths are far from shortest
+
+
+class SearchCancelled(Exception):
+    pass
 
 class NPuzzleGame:
     def __init__(self, initial_state, goal_state, size, tile_size, margin):
@@ -22,12 +30,16 @@ class NPuzzleGame:
         self.solution_path = deque()
         self.solution_index = 0
         self.solver_type = "BFS"  # Default solver type
+        self.solve_thread = None
+        self.solve_result = None
+        self.cancel_event = threading.Event()
+        self.progress = None  # Live SearchStats of the running solve, read by the UI thread
+        self.cache = SolutionCache()
+        self.tile_surfaces = {}  # Pre-rendered tile per (value, tile size, font), font.render is the slow part
 
     def shuffle(self):
-        self.current_state = self.initial_state.copy()
-        for _ in range(1000):
-            neighbors = self.puzzle.get_neighbors(Node(self.current_state))
-            self.current_state = random.choice(neighbors).board
+        self.cancel_solve()
+        self.current_state = random_walk(self.initial_state, 1000)
         self.moves = 0
         self.solve_moves = 0
         self.solved = False
@@ -37,6 +49,7 @@ class NPuzzleGame:
         print("Shuffled to:\n", self.current_state)
 
     def reset(self):
+        self.cancel_solve()
         self.current_state = self.initial_state.copy()
         self.moves = 0
         self.solve_moves = 0
@@ -45,37 +58,93 @@ class NPuzzleGame:
         self.solution_index = 0
         print("Reset to:\n", self.current_state)
 
+    def is_solving(self):
+        return self.solve_thread is not None and self.solve_thread.is_alive()
+
     def solve(self):
+        if self.is_solving():
+            return
+
+        self.puzzle.initial_state = self.current_state.copy()
         if not self.puzzle.is_solvable():
             print("This puzzle is not solvable.")
             return
 
-        self.puzzle.initial_state = self.current_state.copy()
         print(self.puzzle.initial_state)
-        self.solver = Solver(self.puzzle)
+        self.solution_path = deque()
+        self.solution_index = 0
+        if self.solver_type in OPTIMAL_SOLVERS:
+            cached_path = self.cache.lookup_path(self.current_state, self.goal_state)
+            if cached_path is not None:
+                self.solution_path = deque(cached_path)
+                print(f"Solution found in cache: {len(cached_path) - 1} moves")
+                return
+
+        self.solve_result = None
+        self.progress = None
+        self.cancel_event.clear()
+        # The worker gets its own Puzzle so edits on the board cannot change the state being searched
+        puzzle = Puzzle(self.current_state.copy(), self.goal_state)
+        self.solve_thread = threading.Thread(target=self._run_solver, args=(puzzle, self.solver_type), daemon=True)
+        self.solve_thread.start()
+
+    def _run_solver(self, puzzle, solver_type):
+        def report(stats):
+            self.progress = stats
+            if self.cancel_event.is_set():
+                raise SearchCancelled()
+
+        self.solver = Solver(puzzle, progress_callback=report, progress_interval=500)
         try:
-            start_time = time.time()
-            if self.solver_type == "BFS":
-                self.solution_path,temp = deque(self.solver.solve_bfs())
-            elif self.solver_type == "DFS":
-                self.solution_path,temp = deque(self.solver.solve_dfs())
-            elif self.solver_type == "A*":
-                self.solution_path,temp = deque(self.solver.solve_astar())
-            end_time = time.time()
-        except:
-            self.solution_path.clear()
-            self.solve_moves = 0
-            self.moves = 0
-            print("No Solution Found")
-
+            path, stats = self.solver.solve(SOLVER_ALGORITHMS[solver_type])
+            self.solve_result = (solver_type, path, stats, None)
+        except SearchCancelled:
+            self.solve_result = (solver_type, None, self.solver.stats, "cancelled")
+        except MemoryError:
+            self.solve_result = (solver_type, None, self.solver.stats, "out of memory")
+        except Exception as error:
+            self.solve_result = (solver_type, None, self.solver.stats, error)  # Re-raised on the UI thread by poll_solve
+
+    def cancel_solve(self):
+        if self.is_solving():
+            self.cancel_event.set()
+            self.solve_thread.join()
+            self.solve_thread = None
+
+    def poll_solve(self):
+        # Called every frame, swaps the finished solution in once the worker is done
+        if self.solve_thread is None or self.solve_thread.is_alive():
+            return
+        self.solve_thread = None
+        solver_type, path, stats, error = self.solve_result
+        if isinstance(error, Exception):
+            raise error
+
+        if path and solver_type in OPTIMAL_SOLVERS:
+            self.cache.store_path(path, self.goal_state)
+        if path and not np.array_equal(path[0], self.current_state):
+            print("Discarded a solution for a board that has changed since")
+            return
+        self.solution_path = deque(path) if path else deque()
         self.solution_index = 0
         if self.solution_path:
-            print(f"Solution found using {self.solver_type}!")
-            print(f"Time taken: {end_time - start_time:.2f} seconds")
+            print(f"Solution found using {solver_type}!")
+            print(f"Time taken: {stats.elapsed:.2f} seconds, {stats.expanded} nodes expanded")
+        elif error is not None:
+            print(f"No solution found ({error})")
         else:
             print("No solution found!")
 
+    def draw_progress(self, screen, font):
+        if not self.is_solving():
+            return
+        expanded = self.progress.expanded if self.progress else 0
+        elapsed = self.progress.elapsed if self.progress else 0.0
+        text = font.render(f"Solving with {self.solver_type}: {expanded} nodes, {elapsed:.1f}s", True, (0, 0, 0))
+        screen.blit(text, (screen.get_width() // 2 - text.get_width() // 2, 55))
+
     def move(self, pos):
+        self.cancel_solve()
         zero_pos = np.argwhere(self.current_state == 0)[0]
         if pos[0] == zero_pos[0] and abs(pos[1] - zero_pos[1]) == 1:
             self._swap(zero_pos, pos)
@@ -90,18 +159,44 @@ class NPuzzleGame:
         self.current_state[pos1[0], pos1[1]], self.current_state[pos2[0], pos2[1]] = self.current_state[
             pos2[0], pos2[1]], self.current_state[pos1[0], pos1[1]]
 
-    def draw_board(self, screen, font):
+    def tile_surface(self, value, font):
+        key = (value, self.tile_size, font)
+        surface = self.tile_surfaces.get(key)
+        if surface is None:
+            surface = pygame.Surface((self.tile_size, self.tile_size)).convert()
+            if value == 0:
+                surface.fill((255, 255, 255))  # The blank is drawn too, so a single tile can be repainted
+            else:
+                surface.fill((0, 128, 255))
+                text = font.render(str(value), True, (255, 255, 255))
+                surface.blit(text, ((self.tile_size - text.get_width()) // 2,
+                                    (self.tile_size - text.get_height()) // 2))
+            self.tile_surfaces[key] = surface
+        return surface
+
+    def tile_rect(self, screen, i, j):
         start_x = (screen.get_width() - self.screen_size) // 2
         start_y = (screen.get_height() - self.screen_size) // 2 - 50
+        return pygame.Rect(start_x + j * self.tile_size + (j + 1) * self.margin,
+                           start_y + i * self.tile_size + (i + 1) * self.margin,
+                           self.tile_size, self.tile_size)
+
+    def draw_tile(self, screen, font, i, j):
+        rect = self.tile_rect(screen, i, j)
+        screen.blit(self.tile_surface(int(self.current_state[i, j]), font), rect)
+        return rect
+
+    def draw_board(self, screen, font):
         for i in range(self.size):
             for j in range(self.size):
-                if self.current_state[i, j] != 0:
-                    pygame.draw.rect(screen, (0, 128, 255), (start_x + j * self.tile_size + (j + 1) * self.margin,
-                                                             start_y + i * self.tile_size + (i + 1) * self.margin,
-                                                             self.tile_size, self.tile_size))
-                    text = font.render(str(self.current_state[i, j]), True, (255, 255, 255))
-                    screen.blit(text, (start_x + j * self.tile_size + (j + 1) * self.margin + 30,
-                                       start_y + i * self.tile_size + (i + 1) * self.margin + 30))
+                self.draw_tile(screen, font, i, j)
+
+    def show_state(self, next_state, screen, font):
+        # For the animations, which block the main loop: repaints and pushes only the cells that differ, two per
+        # move, instead of flipping the whole screen
+        changed = np.argwhere(self.current_state != next_state)
+        self.current_state = next_state
+        pygame.display.update([self.draw_tile(screen, font, i, j) for i, j in changed])
 
     def draw_moves(self, screen, font, screen_width):
         moves_text = font.render(f"Moves: {self.moves}", True, (0, 0, 0))
@@ -125,12 +220,9 @@ class NPuzzleGame:
         return None
 
     def animate_shuffle(self, screen, font):
+        self.cancel_solve()
         for _ in range(100):
-            neighbors = self.puzzle.get_neighbors(Node(self.current_state))
-            self.current_state = random.choice(neighbors).board
-            screen.fill((255, 255, 255))  # Clear the screen before drawing
-            self.draw_board(screen, font)
-            pygame.display.flip()
+            self.show_state(random_walk(self.current_state, 1), screen, font)
             pygame.time.delay(20)
         self.moves = 0
         self.solve_moves = 0
@@ -139,32 +231,23 @@ class NPuzzleGame:
     def animate_solve(self, solution_queue, screen, font):
         print("Animating solution...")
         while solution_queue:
-            next_state = solution_queue.popleft()
-            self.current_state = next_state
+            self.show_state(solution_queue.popleft(), screen, font)
             self.solve_moves += 1
-            screen.fill((255, 255, 255))  # Clear the screen before drawing
-            self.draw_board(screen, font)
-            pygame.display.flip()
             pygame.time.delay(250)
         print("Solution animation completed, Current state:\n", self.current_state)
 
-    def step_forward(self, screen, font):
+    # The steps only change the state, the main loop repaints the whole board on its next frame anyway
+    def step_forward(self):
         if self.solution_index < len(self.solution_path):
             self.current_state = self.solution_path[self.solution_index]
             self.solution_index += 1
             self.solve_moves += 1
-            screen.fill((255, 255, 255))  # Clear the screen before drawing
-            self.draw_board(screen, font)
-            pygame.display.flip()
 
-    def step_backward(self, screen, font):
+    def step_backward(self):
         if self.solution_index > 0:
             self.solution_index -= 1
             self.current_state = self.solution_path[self.solution_index]
             self.solve_moves -= 1
-            screen.fill((255, 255, 255))  # Clear the screen before drawing
-            self.draw_board(screen, font)
-            pygame.display.flip()
 
 class NpuzzleUI:
     def __init__(self):
@@ -204,6 +287,7 @@ class NpuzzleUI:
         self.solving = False
 
     def open_initial_state_input(self):
+        self.game.cancel_solve()  # A solution for the board being edited would be stale once it arrives
         editing = True
         input_box = pygame.Rect(0, 0, 50, 50)
         color_inactive = pygame.Color('lightskyblue3')
@@ -218,6 +302,7 @@ class NpuzzleUI:
         while editing:
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
+                    self.game.cache.save()
                     pygame.quit()
                     exit()
                 if event.type == pygame.MOUSEBUTTONDOWN:
@@ -272,6 +357,7 @@ class NpuzzleUI:
         bfs_text = self.font.render("BFS", True, (255, 255, 255))
         dfs_text = self.font.render("DFS", True, (255, 255, 255))
         astar_text = self.font.render("A*", True, (255, 255, 255))
+        idastar_text = self.font.render("IDA*", True, (255, 255, 255))
 
         pygame.draw.rect(self.screen, (0, 128, 0) if selected_solver == "BFS" else (128, 128, 128),
                          (self.screen_width // 2 - 480, 5, 100, 40))
@@ -279,10 +365,13 @@ class NpuzzleUI:
                          (self.screen_width // 2 - 350, 5, 100, 40))
         pygame.draw.rect(self.screen, (0, 128, 0) if selected_solver == "A*" else (128, 128, 128),
                          (self.screen_width // 2 - 220, 5, 100, 40))
+        pygame.draw.rect(self.screen, (0, 128, 0) if selected_solver == "IDA*" else (128, 128, 128),
+                         (self.screen_width // 2 - 90, 5, 100, 40))
 
         self.screen.blit(bfs_text, (self.screen_width // 2 - 455, 5 + 5))
         self.screen.blit(dfs_text, (self.screen_width // 2 - 325, 5 + 5))
         self.screen.blit(astar_text, (self.screen_width // 2 - 195, 5 + 5))
+        self.screen.blit(idastar_text, (self.screen_width // 2 - 75, 5 + 5))
 
     def run(self):
         running = True
@@ -302,7 +391,11 @@ class NpuzzleUI:
                             if self.screen_width // 2 - 430 < x < self.screen_width // 2 - 230:
                                 self.game.animate_shuffle(self.screen, self.font)
                             elif self.screen_width // 2 - 200 < x < self.screen_width // 2:
-                                if not self.solving:
+                                if self.game.is_solving():
+                                    self.game.cancel_solve()
+                                    self.solving = False
+                                    print("Solve cancelled")
+                                elif not self.solving:
                                     self.game.solve()
                                     self.solving = True
                             elif self.screen_width // 2 + 30 < x < self.screen_width // 2 + 230:
@@ -310,9 +403,9 @@ class NpuzzleUI:
                             elif self.screen_width // 2 + 250 < x < self.screen_width // 2 + 450:
                                 self.open_initial_state_input()
                         elif self.screen_width - 60 < x < self.screen_width and self.screen_height // 2 - 25 < y < self.screen_height // 2 + 25:
-                            self.game.step_forward(self.screen, self.font)
+                            self.game.step_forward()
                         elif 0 < x < 50 and self.screen_height // 2 - 25 < y < self.screen_height // 2 + 25:
-                            self.game.step_backward(self.screen, self.font)
+                            self.game.step_backward()
                         elif self.screen_width // 2 - 480 < x < self.screen_width // 2 - 380 and 5 < y < 45:
                             self.game.solver_type = "BFS"
                             self.solving = False
@@ -325,6 +418,10 @@ class NpuzzleUI:
                             self.game.solver_type = "A*"
                             self.solving = False
                             self.game.solve_moves = 0
+                        elif self.screen_width // 2 - 90 < x < self.screen_width // 2 + 10 and 5 < y < 45:
+                            self.game.solver_type = "IDA*"
+                            self.solving = False
+                            self.game.solve_moves = 0
 
             self.screen.fill((255, 255, 255))  # Clear the screen before drawing
             self.game.draw_board(self.screen, self.font)
@@ -333,7 +430,9 @@ class NpuzzleUI:
             self.screen.blit(self.back_icon, (10, self.screen_height // 2 - 25))
             self.screen.blit(self.forward_icon, (self.screen_width - 60, self.screen_height // 2 - 25))
 
+            self.game.poll_solve()
             self.game.draw_moves(self.screen, self.font, self.screen_width)
+            self.game.draw_progress(self.screen, self.font)
 
             # Draw the buttons
             button_y = self.screen_height - 90
@@ -343,7 +442,7 @@ class NpuzzleUI:
             pygame.draw.rect(self.screen, (128, 128, 0), (self.screen_width // 2 + 250, button_y, 200, 40))
 
             shuffle_text = self.font.render("Shuffle", True, (255, 255, 255))
-            solve_text = self.font.render("Solve", True, (255, 255, 255))
+            solve_text = self.font.render("Cancel" if self.game.is_solving() else "Solve", True, (255, 255, 255))
             reset_text = self.font.render("Reset", True, (255, 255, 255))
             custom_text = self.font.render("Custom Init", True, (255, 255, 255))
 
@@ -357,6 +456,7 @@ class NpuzzleUI:
             pygame.display.flip()
             clock.tick(30)
 
+        self.game.cache.save()
         pygame.quit()
 
 
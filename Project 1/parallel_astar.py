@@ -0,0 +1,182 @@
+import heapq
+import multiprocessing
+import queue
+import time
+
+# Per-worker counters, one row of the shared counters array each
+SENT, RECEIVED, EXPANDED, GENERATED, DUPLICATES, PEAK_OPEN, PEAK_CLOSED = range(7)
+COUNTERS = 7
+
+CHECK_INBOX_EVERY = 64  # Expansions between polls of the inbox while busy
+FLUSH_EVERY = 1024  # Expansions between forced flushes of the outboxes
+
+
+def owner(state, workers):
+    # Fibonacci hashing spreads states evenly even though neighbouring boards differ in only two cells
+    return ((state * 0x9E3779B97F4A7C15) >> 40) % workers
+
+
+def hda_worker(index, puzzle, heuristic, inboxes, replies, incumbent, counters, idle, done, batch_size):
+    workers = len(inboxes)
+    table = puzzle.tile_table(heuristic)
+    evaluate = puzzle.heuristic_function(heuristic)
+    inbox = inboxes[index]
+    row = index * COUNTERS
+    open_list = []
+    best_g = {}
+    parents = {}
+    outboxes = [[] for _ in range(workers)]
+    stats = [0] * COUNTERS
+
+    def receive(nodes):
+        for state, g, parent, h in nodes:
+            if g < best_g.get(state, float('inf')):
+                best_g[state] = g
+                parents[state] = parent
+                heapq.heappush(open_list, (g + h, h, state))
+            else:
+                stats[DUPLICATES] += 1
+
+    def send(target):
+        # Counted as sent before it is queued, so the received total can never run ahead of it
+        counters[row + SENT] += len(outboxes[target])
+        inboxes[target].put(("nodes", outboxes[target]))
+        outboxes[target] = []
+
+    def publish():
+        for field in (EXPANDED, GENERATED, DUPLICATES):
+            counters[row + field] = stats[field]
+        counters[row + PEAK_OPEN] = max(counters[row + PEAK_OPEN], len(open_list))
+        counters[row + PEAK_CLOSED] = len(best_g)
+
+    countdown = 0
+    while not done.is_set():
+        busy = bool(open_list) and open_list[0][0] < incumbent.value
+        if not busy:
+            for target in range(workers):
+                if outboxes[target]:
+                    send(target)
+            publish()
+            idle[index] = 1
+
+        if not busy or countdown == 0:
+            countdown = CHECK_INBOX_EVERY
+            try:
+                message = inbox.get(timeout=0.01) if not busy else inbox.get_nowait()
+            except queue.Empty:
+                message = None
+            if message is not None:
+                idle[index] = 0  # Marked busy before the receipt is counted, see hda_star
+                kind, payload = message
+                if kind == "stop":
+                    return
+                if kind == "trace":  # Can overtake this worker's check of done
+                    replies.put((payload, parents.get(payload, -1)))
+                    continue
+                receive(payload)
+                counters[row + RECEIVED] += len(payload)
+                countdown = 0  # Drain the rest of the inbox before expanding again
+                continue
+            if not busy:
+                continue
+        countdown -= 1
+
+        f, h, state = heapq.heappop(open_list)
+        g = best_g[state]
+        if g + h != f:
+            continue  # Stale entry, the state was reached more cheaply since
+        if state == puzzle.goal:
+            with incumbent.get_lock():
+                if g < incumbent.value:
+                    incumbent.value = g
+            continue
+
+        stats[EXPANDED] += 1
+        for new_state, _, delta, _ in puzzle.successors(state, table):
+            if new_state == parents[state]:
+                continue  # Never undo the move that led here
+            new_h = h + delta if table is not None else evaluate(new_state)
+            if g + 1 + new_h >= incumbent.value:
+                continue  # Cannot beat the best solution found so far
+            stats[GENERATED] += 1
+            target = owner(new_state, workers)
+            if target == index:
+                receive([(new_state, g + 1, state, new_h)])
+            else:
+                outboxes[target].append((new_state, g + 1, state, new_h))
+                if len(outboxes[target]) >= batch_size:
+                    send(target)
+
+        if stats[EXPANDED] % FLUSH_EVERY == 0:
+            for target in range(workers):
+                if outboxes[target]:
+                    send(target)
+            publish()
+
+    # Search is over, answer parent lookups for the path until told to stop; node batches still in flight
+    # after an aborted search are dropped
+    publish()
+    while True:
+        kind, payload = inbox.get()
+        if kind == "stop":
+            return
+        if kind == "trace":
+            replies.put((payload, parents.get(payload, -1)))
+
+
+def totals(counters, workers):
+    return [sum(counters[index * COUNTERS + field] for index in range(workers)) for field in range(COUNTERS)]
+
+
+def hda_star(puzzle, heuristic="manhattan", workers=2, on_poll=None, batch_size=256, poll_interval=0.005):
+    # Returns the packed states of an optimal path, on_poll(totals) may raise to abort the search
+    context = multiprocessing.get_context()
+    inboxes = [context.Queue() for _ in range(workers)]
+    replies = context.Queue()
+    incumbent = context.Value("d", float('inf'))
+    counters = context.Array("q", workers * COUNTERS, lock=False)
+    idle = context.Array("b", workers, lock=False)
+    done = context.Event()
+    processes = [context.Process(target=hda_worker, daemon=True,
+                                 args=(index, puzzle, heuristic, inboxes, replies, incumbent, counters, idle, done,
+                                       batch_size))
+                 for index in range(workers)]
+    for process in processes:
+        process.start()
+
+    try:
+        initial_state = puzzle.encode(puzzle.initial_state)
+        evaluate = puzzle.heuristic_function(heuristic)
+        inboxes[owner(initial_state, workers)].put(("nodes", [(initial_state, 0, -1, evaluate(initial_state))]))
+        root_sent = 1
+
+        while True:
+            time.sleep(poll_interval)
+            before = totals(counters, workers)
+            if on_poll is not None:
+                on_poll(before)
+            all_idle = all(idle[index] for index in range(workers))
+            after = totals(counters, workers)
+            # Workers only become busy by receiving, so unchanged counters around an all-idle reading
+            # mean no worker woke up while it was taken; sent == received means nothing is in flight
+            if all_idle and before == after and after[SENT] + root_sent == after[RECEIVED]:
+                break
+        done.set()
+
+        if incumbent.value == float('inf'):
+            return None
+        path = [puzzle.goal]
+        while True:
+            inboxes[owner(path[-1], workers)].put(("trace", path[-1]))
+            _, parent = replies.get()
+            if parent == -1:
+                return path[::-1]
+            path.append(parent)
+    finally:
+        done.set()
+        for inbox in inboxes:
+            inbox.put(("stop", None))
+        for process in processes:
+            process.join(timeout=1)
+            if process.is_alive():
+                process.terminate()
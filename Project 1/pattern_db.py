@@ -0,0 +1,158 @@
+import numpy as np
+import argparse
+import os
+from grid import UnsupportedBoard, adjacent_cells, goal_digest, load_table
+
+DEFAULT_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pdb")
+
+# Group sizes used when no partition is given, tiles are taken in goal order
+DEFAULT_GROUP_SIZES = {
+    3: (4, 4),
+    4: (6, 6, 3),
+}
+
+UNKNOWN = 255
+
+
+def permutation_count(cells, k):
+    count = 1
+    for i in range(k):
+        count *= cells - i
+    return count
+
+
+def rank_positions(positions, cells):
+    # Mixed-radix rank of k distinct cells, dense over the P(cells, k) placements
+    rank = 0
+    used = 0
+    for i, position in enumerate(positions):
+        smaller_used = (used & ((1 << position) - 1)).bit_count()
+        rank = rank * (cells - i) + position - smaller_used
+        used |= 1 << position
+    return rank
+
+
+def rank_many(positions, cells):
+    # rank_positions for every row of a (states, k) array of cells at once
+    rank = np.zeros(len(positions), dtype=np.int64)
+    for i in range(positions.shape[1]):
+        smaller_used = (positions[:, :i] < positions[:, i:i + 1]).sum(axis=1)
+        rank = rank * (cells - i) + positions[:, i].astype(np.int64) - smaller_used
+    return rank
+
+
+def default_partition(goal_state):
+    goal_state = np.asarray(goal_state)
+    size = goal_state.shape[0]
+    if size not in DEFAULT_GROUP_SIZES:
+        raise UnsupportedBoard(f"No default pattern partition for {size}x{size} boards")
+    tiles = [int(tile) for tile in goal_state.flatten() if tile != 0]
+    partition = []
+    for group_size in DEFAULT_GROUP_SIZES[size]:
+        partition.append(tiles[:group_size])
+        tiles = tiles[group_size:]
+    return partition
+
+
+class PatternDatabase:
+    def __init__(self, goal_state, tiles, directory=DEFAULT_DIRECTORY, build=False):
+        # Only builds a missing table when asked to, building a 4x4 group takes minutes and GBs
+        self.goal_state = np.asarray(goal_state)
+        self.size = self.goal_state.shape[0]
+        self.cells = self.size * self.size
+        self.tiles = list(tiles)
+        self.path = os.path.join(directory, self.file_name())
+
+        if not build and not os.path.exists(self.path):
+            raise FileNotFoundError(f"Pattern database {self.path} is missing, build it first with "
+                                    f"python pattern_db.py --size {self.size} (and --goal) or build=True")
+        self.table = load_table(self.path, self.build)
+
+    def file_name(self):
+        tiles = "-".join(str(tile) for tile in self.tiles)
+        return f"pdb_{self.size}x{self.size}_{tiles}_{goal_digest(self.goal_state)}.npy"
+
+    def build(self):
+        # Backward 0-1 BFS over (pattern tile cells, blank cell), one cost level at a time with NumPy:
+        # blank moves onto free cells cost 0 and are closed over first, moves of pattern tiles cost 1
+        flat_goal = [int(tile) for tile in self.goal_state.flatten()]
+        adjacent = adjacent_cells(self.size).astype(np.int8)  # Cells as int8 keep the level arrays small
+
+        placements = permutation_count(self.cells, len(self.tiles))
+        table = np.full(placements, UNKNOWN, dtype=np.uint8)
+        distances = np.full(placements * self.cells, UNKNOWN, dtype=np.uint8)
+
+        frontier_positions = np.array([[flat_goal.index(tile) for tile in self.tiles]], dtype=np.int8)
+        frontier_blanks = np.array([flat_goal.index(0)], dtype=np.int8)
+        distances[rank_many(frontier_positions, self.cells) * self.cells + frontier_blanks] = 0
+        cost = 0
+
+        while len(frontier_blanks):
+            level_positions, level_blanks = [frontier_positions], [frontier_blanks]
+            wave_positions, wave_blanks = frontier_positions, frontier_blanks
+            expensive_positions, expensive_blanks = [], []
+            while len(wave_blanks):
+                cheap_positions, cheap_blanks = [], []
+                for move in range(4):
+                    new_blanks = adjacent[wave_blanks, move]
+                    valid = new_blanks >= 0
+                    positions, blanks, new_blanks = wave_positions[valid], wave_blanks[valid], new_blanks[valid]
+                    hits = positions == new_blanks[:, None]  # The pattern tile on the blank's new cell, if any
+                    moved = hits.any(axis=1)
+                    cheap_positions.append(positions[~moved])
+                    cheap_blanks.append(new_blanks[~moved])
+                    positions = positions[moved]
+                    positions[hits[moved]] = blanks[moved]  # The pattern tile slides into the old blank cell
+                    expensive_positions.append(positions)
+                    expensive_blanks.append(new_blanks[moved])
+                wave_positions, wave_blanks = self.unseen(distances, cheap_positions, cheap_blanks, cost)
+                level_positions.append(wave_positions)
+                level_blanks.append(wave_blanks)
+
+            # Levels leave in non-decreasing cost, so a placement's first level is its distance
+            ranks = rank_many(np.concatenate(level_positions), self.cells)
+            table[ranks[table[ranks] == UNKNOWN]] = cost
+            cost += 1
+            frontier_positions, frontier_blanks = self.unseen(distances, expensive_positions, expensive_blanks, cost)
+
+        return table
+
+    def unseen(self, distances, positions, blanks, cost):
+        # The distinct states among the candidates that have no distance yet, marked with cost
+        positions, blanks = np.concatenate(positions), np.concatenate(blanks)
+        keys = rank_many(positions, self.cells) * self.cells + blanks
+        keys, first = np.unique(keys, return_index=True)
+        new = distances[keys] == UNKNOWN
+        distances[keys[new]] = cost
+        return positions[first[new]], blanks[first[new]]
+
+    def lookup(self, tile_cells):
+        return int(self.table[rank_positions([tile_cells[tile] for tile in self.tiles], self.cells)])
+
+
+class AdditivePatternDatabase:
+    def __init__(self, goal_state, partition=None, directory=DEFAULT_DIRECTORY, build=False):
+        if partition is None:
+            partition = default_partition(goal_state)
+        seen = [tile for group in partition for tile in group]
+        if 0 in seen or len(seen) != len(set(seen)):
+            raise ValueError("Pattern groups must be disjoint and must not contain the blank")
+        self.databases = [PatternDatabase(goal_state, group, directory, build) for group in partition]
+
+    def value(self, tile_cells):
+        # Groups are disjoint and only count their own moves, so the lookups add up admissibly
+        return sum(database.lookup(tile_cells) for database in self.databases)
+
+
+if __name__ == "__main__":
+    # Builds the default databases once, searches only memory-map them
+    parser = argparse.ArgumentParser(description="Build the additive pattern databases for the pdb heuristic")
+    parser.add_argument("--size", type=int, nargs="+", default=[3], choices=sorted(DEFAULT_GROUP_SIZES))
+    parser.add_argument("--goal", type=int, nargs="+", help="Goal tiles row by row, the blank first by default")
+    parser.add_argument("--directory", default=DEFAULT_DIRECTORY)
+    args = parser.parse_args()
+    for size in args.size:
+        goal_state = np.array(args.goal if args.goal else range(size * size)).reshape(size, size)
+        for group in default_partition(goal_state):
+            database = PatternDatabase(goal_state, group, args.directory, build=True)
+            print(f"{database.path}: {len(database.table)} placements")
@@ -0,0 +1,75 @@
+import numpy as np
+import os
+import pickle
+from collections import OrderedDict
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "solution_cache.pkl")
+
+
+class SolutionCache:
+    # LRU map from (size, goal, board) to (optimal distance, cell the blank moves to next)
+    def __init__(self, capacity=200000, path=DEFAULT_PATH):
+        self.capacity = capacity
+        self.path = path
+        self.entries = OrderedDict()
+        if path is not None and os.path.exists(path):
+            self.load()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def key(self, board, goal_state):
+        board = np.asarray(board, dtype=np.int32)
+        return board.shape[0], np.asarray(goal_state, dtype=np.int32).tobytes(), board.tobytes()
+
+    def store_path(self, path, goal_state):
+        # Every suffix of an optimal path is optimal too, so each board on it gets an entry
+        goal_key = np.asarray(goal_state, dtype=np.int32).tobytes()
+        for index, board in enumerate(path):
+            board = np.asarray(board, dtype=np.int32)
+            if index + 1 < len(path):
+                next_blank = int(np.flatnonzero(np.asarray(path[index + 1]).flatten() == 0)[0])
+            else:
+                next_blank = -1  # Already at the goal
+            key = (board.shape[0], goal_key, board.tobytes())
+            self.entries[key] = (len(path) - 1 - index, next_blank)
+            self.entries.move_to_end(key)
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+
+    def distance(self, board, goal_state):
+        entry = self.entries.get(self.key(board, goal_state))
+        return entry[0] if entry is not None else None
+
+    def lookup_path(self, board, goal_state):
+        # Follows the stored next moves to the goal, None if the board or any later step is missing
+        board = np.array(board, dtype=np.int32)
+        size = board.shape[0]
+        goal_key = np.asarray(goal_state, dtype=np.int32).tobytes()
+        path = [board.copy()]
+        while True:
+            key = (size, goal_key, board.tobytes())
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            self.entries.move_to_end(key)
+            distance, next_blank = entry
+            if distance == 0:
+                return path
+            flat = board.reshape(-1)
+            blank = int(np.flatnonzero(flat == 0)[0])
+            flat[blank], flat[next_blank] = flat[next_blank], 0
+            path.append(board.copy())
+
+    def save(self):
+        temporary_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temporary_path, "wb") as file:
+            pickle.dump({"capacity": self.capacity, "entries": list(self.entries.items())}, file)
+        os.replace(temporary_path, self.path)
+
+    def load(self):
+        with open(self.path, "rb") as file:
+            data = pickle.load(file)
+        self.entries = OrderedDict(data["entries"])
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
@@ -0,0 +1,149 @@
+import numpy as np
+import math
+
+MASK64 = (1 << 64) - 1
+GOLDEN = 0x9E3779B97F4A7C15  # 2^64 / golden ratio, Fibonacci hashing
+MIX = 0xBF58476D1CE4E5B9  # Second multiplier for an independent hash (from splitmix64)
+
+
+class StateSet:
+    # Open-addressing hash set of packed states (boards up to 4x4) in a uint64 array with linear probing.
+    # 0 marks an empty slot, no board packs to 0 because some tile other than the blank is always non-zero
+    def __init__(self, capacity=1024, max_load=0.5):
+        self.max_load = max_load
+        self.count = 0
+        self.allocate(capacity)
+
+    def allocate(self, capacity):
+        self.bits = max(4, math.ceil(capacity / self.max_load - 1).bit_length())
+        self.table = np.zeros(1 << self.bits, dtype=np.uint64)
+        self.slots = memoryview(self.table)  # Scalar access through the memoryview skips NumPy's boxing
+        self.mask = (1 << self.bits) - 1
+        self.shift = 64 - self.bits
+        self.limit = int((1 << self.bits) * self.max_load)
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, state):
+        slots, mask = self.slots, self.mask
+        index = ((state * GOLDEN) & MASK64) >> self.shift
+        while True:
+            slot = slots[index]
+            if slot == state:
+                return True
+            if slot == 0:
+                return False
+            index = (index + 1) & mask
+
+    def add(self, state):
+        # Returns True if the state was not in the set yet
+        slots, mask = self.slots, self.mask
+        index = ((state * GOLDEN) & MASK64) >> self.shift
+        while True:
+            slot = slots[index]
+            if slot == state:
+                return False
+            if slot == 0:
+                break
+            index = (index + 1) & mask
+        slots[index] = state
+        self.count += 1
+        if self.count > self.limit:
+            self.grow()
+        return True
+
+    def indexes(self, states):
+        return ((states * np.uint64(GOLDEN)) >> np.uint64(self.shift)).astype(np.intp)  # Wraps mod 2^64
+
+    def contains_many(self, states):
+        # Vectorized membership, all states probe their next slot together
+        states = np.asarray(states, dtype=np.uint64)
+        found = np.zeros(len(states), dtype=bool)
+        pending = np.arange(len(states))
+        index = self.indexes(states)
+        while len(pending):
+            slots = self.table[index]
+            hit = slots == states[pending]
+            found[pending[hit]] = True
+            probing = ~hit & (slots != 0)
+            pending, index = pending[probing], (index[probing] + 1) & self.mask
+        return found
+
+    def add_many(self, states):
+        # Vectorized insert, returns a mask of the states that were new (the first copy of a repeated one)
+        states = np.asarray(states, dtype=np.uint64)
+        new = np.zeros(len(states), dtype=bool)
+        _, first = np.unique(states, return_index=True)
+        first = first[~self.contains_many(states[first])]
+        new[first] = True
+        if self.count + len(first) > self.limit:
+            self.grow(self.count + len(first))
+        self.insert(states[first])
+        return new
+
+    def insert(self, states):
+        # States known to be distinct and absent; when several want the same empty slot one wins per round
+        index = self.indexes(states)
+        while len(states):
+            empty = self.table[index] == 0
+            slots, winners = np.unique(index[empty], return_index=True)
+            self.table[slots] = states[empty][winners]
+            placed = np.zeros(len(states), dtype=bool)
+            placed[np.flatnonzero(empty)[winners]] = True
+            states, index = states[~placed], (index[~placed] + 1) & self.mask
+            self.count += len(slots)
+
+    def grow(self, needed=0):
+        states = self.table[self.table != 0]
+        self.count = 0
+        self.allocate(max(len(states), needed) * 2)
+        self.insert(states)
+
+
+class BloomFilter:
+    # Approximate set of packed states: an added state is always found, others are wrongly reported
+    # present at about error_rate once capacity states are in, so a search using it may skip real states
+    def __init__(self, capacity, error_rate=0.001):
+        self.size = max(64, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.array = np.zeros((self.size + 7) // 8, dtype=np.uint8)
+        self.bytes = memoryview(self.array)
+        self.count = 0  # States added that were not reported present, an estimate of the set size
+
+    def __len__(self):
+        return self.count
+
+    def probe(self, state):
+        # Double hashing: bit i is h1 + i * h2 (mod size), with h2 odd. Returns the first bit and the step
+        # between bits, so callers walk the positions without building a list of them
+        size = self.size
+        h2 = (((state ^ (state >> 29)) * MIX) & MASK64) | 1
+        return ((state * GOLDEN) & MASK64) % size, h2 % size
+
+    def __contains__(self, state):
+        data, size = self.bytes, self.size
+        position, step = self.probe(state)
+        for _ in range(self.hashes):
+            if not data[position >> 3] & (1 << (position & 7)):
+                return False
+            position += step
+            if position >= size:
+                position -= size
+        return True
+
+    def add(self, state):
+        # Returns True if some bit was still clear, so one call both tests and inserts
+        data, size = self.bytes, self.size
+        position, step = self.probe(state)
+        new = False
+        for _ in range(self.hashes):
+            bit = 1 << (position & 7)
+            if not data[position >> 3] & bit:
+                data[position >> 3] |= bit
+                new = True
+            position += step
+            if position >= size:
+                position -= size
+        self.count += new
+        return new